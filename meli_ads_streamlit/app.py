@@ -1,12 +1,25 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime, timedelta
 
 # Importar módulos personalizados
-from meli_ads_collector_module import run_collector
-from data_processor_module import process_and_export, get_client_data, get_business_metrics, get_ads_overview_metrics
-from strategy_analyzer_module import hardcoded_strategy_model_data
+from meli_ads_collector_module import run_items_collector
+from data_processor_module import (
+    get_client_data, get_overview_metrics, get_daily_business_metrics, get_daily_ads_metrics, get_orders_table,
+    get_campaign_trend,
+    refresh_client_data, collect_and_process, get_month_to_date_metrics, get_monthly_targets,
+    save_monthly_targets, MEMO_TTL,
+)
+from job_runner_module import get_job_runner, job_key, DONE, FAILED
+from export_module import available_formats, export_to_bytes, MIME_TYPES
+from strategy_analyzer_module import get_strategy_model
+from metrics_warehouse_module import SNAPSHOT_METRICS, add_derived_metrics
+from goals_module import GOAL_METRICS, goal_progress
+from response_cache_module import today_meli
+from instrumentation_module import get_registry
+from forecast_module import FORECAST_METHODS, FORECAST_METRICS, account_forecast, forecast_campaigns, forecast_series
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -28,11 +41,12 @@ def render_overview_page(access_token, advertiser_id, date_range):
     start_date, end_date = date_range
     st.write(f"Período selecionado: **{start_date.strftime('%d/%m/%Y')}** a **{end_date.strftime('%d/%m/%Y')}**")
 
+    # As duas consultas são independentes e rodam em paralelo
+    with st.spinner("Buscando métricas gerais e de publicidade..."):
+        business_metrics, ads_metrics = get_overview_metrics(access_token, advertiser_id, start_date, end_date)
+
     # --- Métricas Gerais da Conta ---
     st.subheader("Métricas Gerais da Conta")
-    with st.spinner("Buscando métricas gerais..."):
-        business_metrics = get_business_metrics(access_token, start_date, end_date)
-    
     if business_metrics:
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Faturamento (Vendas Brutas)", f"R$ {business_metrics.get('vendas_brutas', 0):,.2f}")
@@ -46,9 +60,6 @@ def render_overview_page(access_token, advertiser_id, date_range):
 
     # --- Métricas de Publicidade ---
     st.subheader("Métricas de Publicidade")
-    with st.spinner("Buscando métricas de publicidade..."):
-        ads_metrics = get_ads_overview_metrics(access_token, advertiser_id, start_date, end_date)
-
     if ads_metrics:
         col1, col2, col3, col4, col5 = st.columns(5)
         col1.metric("Investimento", f"R$ {ads_metrics.get('cost', 0):,.2f}")
@@ -62,6 +73,207 @@ def render_overview_page(access_token, advertiser_id, date_range):
     else:
         st.error("Não foi possível carregar as métricas de publicidade.")
 
+def render_daily_page(access_token, advertiser_id, date_range):
+    """Renderiza a página de Acompanhamento Diário com as métricas de negócio e de publicidade por dia."""
+    st.header("Acompanhamento Diário")
+
+    if len(date_range) != 2:
+        st.warning("Por favor, selecione um intervalo de datas válido na barra lateral.")
+        return
+
+    start_date, end_date = date_range
+    with st.spinner("Buscando métricas diárias..."):
+        daily_df = get_daily_business_metrics(access_token, start_date, end_date)
+
+    if daily_df is None or daily_df.empty:
+        st.error("Não foi possível carregar as métricas diárias da conta.")
+        return
+
+    daily_df = daily_df.set_index("dia")
+    st.subheader("Faturamento por Dia")
+    st.line_chart(daily_df["vendas_brutas"])
+    st.subheader("Vendas e Unidades por Dia")
+    st.bar_chart(daily_df[["total_de_vendas", "unidades_vendidas"]])
+    st.dataframe(daily_df, use_container_width=True)
+
+    if st.toggle("Analisar pedidos por status e por item", help="Carrega todos os pedidos do período em memória."):
+        render_orders_breakdown(access_token, start_date, end_date)
+
+    st.divider()
+    render_daily_ads_section(access_token, advertiser_id, start_date, end_date)
+
+def render_orders_breakdown(access_token, start_date, end_date):
+    """Pedidos por status (incluindo cancelamentos) e itens mais vendidos no período."""
+    with st.spinner("Carregando pedidos..."):
+        orders = get_orders_table(access_token, start_date, end_date)
+    if orders is None:
+        st.error("Não foi possível carregar os pedidos do período.")
+        return
+    if not len(orders):
+        st.info("Nenhum pedido no período.")
+        return
+
+    st.subheader("Pedidos por Status")
+    st.dataframe(orders.by_status(), use_container_width=True, hide_index=True)
+    daily = orders.by_day().set_index("dia")
+    st.line_chart(
+        (daily["qtd_vendas_canceladas"] / (daily["total_de_vendas"] + daily["qtd_vendas_canceladas"]) * 100)
+        .rename("Cancelamentos (%)")
+    )
+    st.subheader("Itens Mais Vendidos")
+    st.dataframe(orders.by_item().head(50), use_container_width=True, hide_index=True)
+
+def render_daily_ads_section(access_token, advertiser_id, start_date, end_date):
+    """Métricas de publicidade dia a dia: totais da conta e tabela por campanha."""
+    st.subheader("Publicidade por Dia")
+    with st.spinner("Buscando métricas diárias de publicidade..."):
+        ads_daily_df = get_daily_ads_metrics(access_token, advertiser_id, start_date, end_date)
+
+    if ads_daily_df is None:
+        st.error("Não foi possível carregar as métricas diárias de publicidade.")
+        return
+    if ads_daily_df.empty:
+        st.info("Nenhuma métrica de publicidade no período.")
+        return
+
+    totals = add_derived_metrics(ads_daily_df.groupby("day")[list(SNAPSHOT_METRICS)].sum())
+    st.line_chart(totals[["cost", "total_amount"]].rename(columns={"cost": "Investimento", "total_amount": "Receita"}))
+    st.line_chart(totals["acos"].rename("ACOS (%)"))
+    st.dataframe(
+        ads_daily_df[["day", "name", "prints", "clicks", "cost", "total_amount", "acos"]],
+        use_container_width=True, hide_index=True,
+    )
+    render_campaign_trend(access_token, advertiser_id, start_date, end_date, ads_daily_df)
+
+# Métricas disponíveis na tendência por campanha
+TREND_METRICS = {
+    "acos": "ACOS (%)", "roas": "ROAS", "cost": "Investimento", "total_amount": "Receita",
+    "clicks": "Cliques", "ctr": "CTR (%)", "cpc": "CPC",
+}
+
+def render_campaign_trend(access_token, advertiser_id, start_date, end_date, ads_daily_df, top_n=10):
+    """Tendência diária de uma métrica para as campanhas com maior investimento no período."""
+    st.subheader("Tendência por Campanha")
+    metric = st.selectbox("Métrica", list(TREND_METRICS), format_func=TREND_METRICS.get, key="trend_metric")
+    spend = ads_daily_df.groupby("campaign_id")["cost"].sum().nlargest(top_n)
+    trend = get_campaign_trend(access_token, advertiser_id, start_date, end_date, metric, spend.index)
+    if trend is None or trend.empty:
+        st.info("Sem histórico diário para o período.")
+        return
+    names = ads_daily_df.groupby("campaign_id")["name"].last()
+    st.caption(f"{len(trend.columns)} campanhas com maior investimento no período")
+    st.line_chart(trend.rename(columns=lambda campaign_id: names.get(campaign_id, campaign_id)))
+
+def render_goals_page(access_token, advertiser_id):
+    """Renderiza a página Estrela Guia: metas do mês, ritmo e quanto falta por dia."""
+    st.header("Estrela Guia")
+    today = today_meli()
+    month = today.strftime("%Y-%m")
+    targets = get_monthly_targets(access_token, month)
+
+    with st.expander(f"Metas de {today.strftime('%m/%Y')}", expanded=not targets):
+        with st.form("goals_form"):
+            columns = st.columns(3)
+            new_targets = {
+                metric: columns[i % 3].number_input(label, min_value=0.0, value=float(targets.get(metric, 0.0)))
+                for i, (metric, label) in enumerate(GOAL_METRICS.items())
+            }
+            if st.form_submit_button("Salvar metas"):
+                if save_monthly_targets(access_token, month, new_targets):
+                    targets = get_monthly_targets(access_token, month)
+                    st.success("Metas salvas!")
+                else:
+                    st.error("Não foi possível identificar o vendedor para salvar as metas.")
+
+    if not targets:
+        st.info("Defina ao menos uma meta para acompanhar o mês.")
+        return
+
+    with st.spinner("Atualizando o acumulado do mês..."):
+        totals = get_month_to_date_metrics(access_token, advertiser_id)
+    if totals is None:
+        st.error("Não foi possível carregar o acumulado do mês.")
+        return
+
+    progress_df = goal_progress(totals, targets, today)
+    for row in progress_df.itertuples(index=False):
+        st.markdown(f"**{row.rotulo}**")
+        col1, col2, col3, col4 = st.columns(4)
+        # ACOS sem receita de Ads não tem valor
+        col1.metric("Realizado", f"{row.realizado:,.2f}" if np.isfinite(row.realizado) else "-", help=f"Meta: {row.meta:,.2f}")
+        col2.metric("Ritmo", f"{row.ritmo_pct:.0f}%" if np.isfinite(row.ritmo_pct) else "-")
+        col3.metric("Projeção no fim do mês", f"{row.projecao_fim_mes:,.2f}" if np.isfinite(row.projecao_fim_mes) else "-")
+        col4.metric("Necessário por dia", f"{row.necessario_por_dia:,.2f}" if np.isfinite(row.necessario_por_dia) else "-")
+        if np.isfinite(row.atingido_pct):
+            st.progress(min(row.atingido_pct / 100, 1.0))
+        if row.no_ritmo: st.success("No ritmo para bater a meta")
+        else: st.warning("Abaixo do ritmo necessário")
+
+def render_projection_page(access_token, advertiser_id, date_range):
+    """Renderiza a página de Projeção: receita, investimento, ACOS e unidades projetados a partir do histórico diário."""
+    st.header("Projeção")
+
+    if len(date_range) != 2:
+        st.warning("Por favor, selecione um intervalo de datas válido na barra lateral.")
+        return
+
+    start_date, end_date = date_range
+    # O dia corrente ainda está aberto: com ele, o último ponto (o de maior peso) puxaria a projeção para baixo
+    end_date = min(end_date, today_meli() - timedelta(days=1))
+    if end_date < start_date:
+        st.warning("A projeção usa apenas dias encerrados; selecione um período que termine antes de hoje.")
+        return
+    st.caption(f"Histórico de {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')} (o dia de hoje não entra no ajuste).")
+    col1, col2 = st.columns([1, 2])
+    horizon = col1.selectbox("Dias projetados", [7, 14, 30, 60], index=2, key="projection_horizon")
+    method = col2.radio(
+        "Modelo", list(FORECAST_METHODS), format_func=FORECAST_METHODS.get, horizontal=True, key="projection_method"
+    )
+    if (end_date - start_date).days < 13:
+        st.info("Para considerar a sazonalidade semanal, selecione ao menos 14 dias de histórico.")
+
+    with st.spinner("Buscando histórico diário..."):
+        ads_daily_df = get_daily_ads_metrics(access_token, advertiser_id, start_date, end_date)
+        orders_daily_df = get_daily_business_metrics(access_token, start_date, end_date)
+
+    st.subheader("Vendas da Conta")
+    if orders_daily_df is None or orders_daily_df.empty:
+        st.error("Não foi possível carregar o histórico de vendas da conta.")
+    else:
+        orders_forecast = forecast_series(orders_daily_df, ["vendas_brutas", "unidades_vendidas"], horizon, method)
+        col1, col2 = st.columns(2)
+        col1.metric(f"Faturamento projetado ({horizon} dias)", f"R$ {orders_forecast['vendas_brutas'].sum():,.2f}")
+        col2.metric(f"Unidades projetadas ({horizon} dias)", f"{orders_forecast['unidades_vendidas'].sum():,.0f}")
+        history = orders_daily_df.set_index("dia")["vendas_brutas"].rename("Realizado")
+        st.line_chart(pd.concat([history, orders_forecast["vendas_brutas"].rename("Projetado")], axis=1))
+
+    st.divider()
+    st.subheader("Publicidade")
+    if ads_daily_df is None or ads_daily_df.empty:
+        st.error("Não foi possível carregar o histórico de publicidade.")
+        return
+
+    campaign_forecast = forecast_campaigns(ads_daily_df, horizon, method)
+    totals = account_forecast(campaign_forecast)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Investimento projetado", f"R$ {totals['cost'].sum():,.2f}")
+    col2.metric("Receita projetada", f"R$ {totals['total_amount'].sum():,.2f}")
+    projected_acos = totals['cost'].sum() / totals['total_amount'].sum() * 100 if totals['total_amount'].sum() else 0
+    col3.metric("ACOS projetado", f"{projected_acos:.2f}%")
+    col4.metric("Unidades projetadas", f"{totals['units_quantity'].sum():,.0f}")
+    st.line_chart(totals[["cost", "total_amount"]].rename(columns={"cost": "Investimento", "total_amount": "Receita"}))
+
+    per_campaign = add_derived_metrics(
+        campaign_forecast.groupby(["campaign_id", "name"], sort=False)[list(FORECAST_METRICS)].sum()
+    ).reset_index().sort_values("total_amount", ascending=False)
+    st.dataframe(
+        per_campaign[["name", "cost", "total_amount", "acos", "units_quantity"]].rename(columns={
+            "name": "Campanha", "cost": "Investimento", "total_amount": "Receita",
+            "acos": "ACOS (%)", "units_quantity": "Unidades",
+        }),
+        use_container_width=True, hide_index=True,
+    )
+
 def render_ads_page(access_token, advertiser_id):
     """Renderiza a página de Análise de Campanhas (antiga funcionalidade)."""
     st.header("Análise Detalhada de Campanhas de Ads")
@@ -73,36 +285,155 @@ def render_ads_page(access_token, advertiser_id):
         key="status_filter_campaigns"
     )
 
+    with_tacos = st.checkbox(
+        "Considerar TACOS (investimento / vendas totais) na recomendação",
+        help="Cruza os pedidos dos últimos 30 dias com os anúncios de cada campanha; a coleta fica mais demorada.",
+    )
+
+    runner = get_job_runner()
+    key = job_key("analise_campanhas", access_token, advertiser_id)
     if st.button("Executar Análise de Campanhas", type="primary"):
-        with st.spinner("Analisando campanhas..."):
-            try:
-                campaigns_df = run_collector(access_token, advertiser_id)
-                if campaigns_df.empty:
-                    st.error("Nenhuma campanha encontrada para este anunciante.")
-                else:
-                    filename, consolidated_df = process_and_export(campaigns_df, st.session_state.client_name)
-                    st.session_state.last_analysis = {"consolidated_df": consolidated_df, "filename": filename}
-                    st.success("Análise de campanhas concluída!")
-            except Exception as e:
-                st.error(f"Erro durante a análise de campanhas: {str(e)}")
+        runner.submit(key, collect_and_process, access_token, advertiser_id, with_tacos=with_tacos)
+
+    job = runner.get(key)
+    if job is not None:
+        render_job_status(job)
     
     if "last_analysis" in st.session_state:
         full_df = st.session_state.last_analysis["consolidated_df"]
         
-        if status_filter == "Ativas": display_df = full_df[full_df['status'] == 'active'].copy()
-        elif status_filter == "Inativas": display_df = full_df[full_df['status'] != 'active'].copy()
-        else: display_df = full_df.copy()
+        if status_filter == "Ativas": display_df = full_df[full_df['status'] == 'active']
+        elif status_filter == "Inativas": display_df = full_df[full_df['status'] != 'active']
+        else: display_df = full_df
 
+        render_export_section(st.session_state.last_analysis, st.session_state.client_name)
         st.markdown(f"#### Exibindo {len(display_df)} de {len(full_df)} campanhas.")
         
         if display_df.empty:
             st.info(f"Nenhuma campanha encontrada com o status '{status_filter}'.")
         else:
-            strategy_df = pd.DataFrame(hardcoded_strategy_model_data)
-            for _, campaign in display_df.iterrows():
-                create_campaign_card(campaign, strategy_df)
+            render_campaigns_list(display_df, get_strategy_model())
+
+    render_items_section(access_token, advertiser_id)
+
+def render_export_section(analysis, client_name):
+    """Gera a exportação em memória e a oferece para download (nada é gravado em disco)."""
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Formato", available_formats(), key="export_format")
+    exports = analysis.setdefault("exports", {})
+    if fmt not in exports and col2.button("Preparar arquivo para download"):
+        with st.spinner("Gerando arquivo..."):
+            exports[fmt] = export_to_bytes(analysis["consolidated_df"], fmt)
+    if fmt in exports:
+        col2.download_button(
+            "Baixar análise", exports[fmt],
+            file_name=f"{client_name}_analise_campanhas.{fmt}", mime=MIME_TYPES[fmt],
+        )
+
+def render_job_status(job):
+    """Mostra o andamento do job de análise e, ao terminar, carrega o resultado na sessão."""
+    if job.status == FAILED:
+        st.error(f"Erro durante a análise de campanhas: {job.error}")
+        return
+    if job.status == DONE:
+        # Cada job concluído é carregado uma única vez por sessão
+        if st.session_state.get("last_analysis_job_id") != job.id:
+            st.session_state.last_analysis_job_id = job.id
+            consolidated_df = job.result
+            if consolidated_df.empty:
+                st.error("Nenhuma campanha encontrada para este anunciante.")
+            else:
+                st.session_state.last_analysis = {"consolidated_df": consolidated_df, "job_id": job.id}
+                st.success("Análise de campanhas concluída!")
+        return
+    render_job_progress(job)
+
+@st.fragment(run_every=1)
+def render_job_progress(job):
+    """Atualiza a barra de progresso a cada segundo sem bloquear o restante da página."""
+    if job.finished:
+        st.rerun()
+    fraction = job.progress_fraction()
+    text = f"{job.stage or 'Aguardando na fila'}..."
+    if job.pages_total:
+        text += f" página {job.pages_done} de {job.pages_total} ({job.rows} campanhas)"
+    st.progress(fraction or 0.0, text=text)
 
-def create_campaign_card(campaign_data, strategy_data):
+# Ordenações disponíveis na lista de campanhas: rótulo -> (coluna, crescente)
+CAMPAIGN_SORT_OPTIONS = {
+    "Maior diferença de orçamento": ("Diferença de Orçamento (abs)", False),
+    "Maior diferença de ACOS": ("Diferença de ACOS", False),
+    "Nome": ("name", True),
+}
+CAMPAIGN_PAGE_SIZES = [10, 25, 50, 100]
+
+def with_strategy_gaps(display_df, strategy_model):
+    """Acrescenta, de forma vetorizada, os valores da estratégia recomendada e as diferenças para a campanha."""
+    strategy_names = display_df["Estrategia_Recomendada"].to_numpy(dtype=object)
+    strategy_budget = strategy_model.values_for(strategy_names, "Orçamento", default=0.0)
+    strategy_acos = strategy_model.values_for(strategy_names, "ACOS", default=0.0)
+    current_budget = pd.to_numeric(display_df["Orçamento"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    current_acos = pd.to_numeric(display_df["ACOS"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    budget_diff = np.nan_to_num(strategy_budget) - current_budget
+    return display_df.assign(**{
+        "Orçamento Recomendado": strategy_budget,
+        "ACOS da Estratégia": strategy_acos,
+        "Diferença de Orçamento": budget_diff,
+        "Diferença de Orçamento (abs)": np.abs(budget_diff),
+        "Diferença de ACOS": np.abs(current_acos - np.nan_to_num(strategy_acos)),
+    })
+
+def render_campaigns_list(display_df, strategy_model):
+    """Lista as campanhas paginadas: só a fatia visível cria widgets."""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    sort_label = col1.selectbox("Ordenar por", list(CAMPAIGN_SORT_OPTIONS), key="campaigns_sort")
+    page_size = col2.selectbox("Campanhas por página", CAMPAIGN_PAGE_SIZES, key="campaigns_page_size")
+    view_mode = col3.radio("Visualização", ("Cards", "Tabela compacta"), horizontal=True, key="campaigns_view_mode")
+
+    sort_column, ascending = CAMPAIGN_SORT_OPTIONS[sort_label]
+    sorted_df = with_strategy_gaps(display_df, strategy_model).sort_values(
+        sort_column, ascending=ascending, kind="stable"
+    )
+
+    if view_mode == "Tabela compacta":
+        columns = ["name", "status", "Estrategia_Recomendada", "ACOS", "ACOS da Estratégia",
+                   "Orçamento", "Orçamento Recomendado", "Diferença de Orçamento"]
+        columns += [c for c in ("metric_tacos", "vendas_totais", "vendas_organicas") if c in sorted_df.columns]
+        st.dataframe(sorted_df[columns], use_container_width=True, hide_index=True)
+        return
+
+    n_pages = max(1, -(-len(sorted_df) // page_size))
+    # O filtro de status e o tamanho da página mudam o total de páginas; a página guardada precisa caber nele
+    st.session_state["campaigns_page"] = min(max(st.session_state.get("campaigns_page", 1), 1), n_pages)
+    page = st.number_input(f"Página (de {n_pages})", min_value=1, max_value=n_pages, step=1, key="campaigns_page")
+    start = (page - 1) * page_size
+    for _, campaign in sorted_df.iloc[start:start + page_size].iterrows():
+        create_campaign_card(campaign, strategy_model)
+
+def render_items_section(access_token, advertiser_id):
+    """Renderiza as métricas por anúncio (item), destacando os maiores ACOS."""
+    st.divider()
+    st.subheader("Métricas por Anúncio")
+    if st.button("Carregar métricas por anúncio"):
+        with st.spinner("Buscando métricas dos anúncios..."):
+            try:
+                st.session_state.items_metrics = run_items_collector(access_token, advertiser_id)
+            except Exception as e:
+                st.error(f"Erro ao buscar métricas por anúncio: {str(e)}")
+
+    items_df = st.session_state.get("items_metrics")
+    if items_df is None:
+        return
+    if items_df.empty:
+        st.info("Nenhum anúncio encontrado para este anunciante.")
+        return
+
+    st.markdown(f"#### {len(items_df)} anúncios nos últimos 30 dias")
+    if "metric_acos" in items_df.columns:
+        items_df = items_df.sort_values("metric_acos", ascending=False)
+    st.dataframe(items_df, use_container_width=True, hide_index=True)
+
+def create_campaign_card(campaign_data, strategy_model):
     """Cria um card visual para uma campanha."""
     campaign_name = campaign_data.get("name", "Campanha sem nome")
     strategy_name = campaign_data.get("Estrategia_Recomendada", "Nenhuma estratégia")
@@ -113,13 +444,12 @@ def create_campaign_card(campaign_data, strategy_data):
     
     strategy_acos = 0
     strategy_budget = 0
-    if strategy_data is not None and not strategy_data.empty:
-        strategy_row = strategy_data[strategy_data["Nome"] == strategy_name]
-        if not strategy_row.empty:
-            strategy_acos = strategy_row.iloc[0].get("ACOS", 0)
-            if pd.isna(strategy_acos): strategy_acos = 0
-            strategy_budget = strategy_row.iloc[0].get("Orçamento", 0)
-            if pd.isna(strategy_budget): strategy_budget = 0
+    strategy_row = strategy_model.get(strategy_name) if strategy_model is not None else None
+    if strategy_row is not None:
+        strategy_acos = strategy_row.get("ACOS", 0)
+        if pd.isna(strategy_acos): strategy_acos = 0
+        strategy_budget = strategy_row.get("Orçamento", 0)
+        if pd.isna(strategy_budget): strategy_budget = 0
     
     budget_diff = strategy_budget - current_budget
 
@@ -131,6 +461,9 @@ def create_campaign_card(campaign_data, strategy_data):
         with col1:
             st.metric("ACOS Atual", f"{current_acos:.2f}%")
             st.metric("Orçamento Atual", f"R$ {current_budget:,.2f}")
+            tacos = campaign_data.get("metric_tacos")
+            if tacos is not None and not pd.isna(tacos):
+                st.metric("TACOS", f"{tacos:.2f}%")
         with col2:
             st.metric("ACOS da Estratégia", f"{strategy_acos:.2f}%")
             st.metric("Orçamento Recomendado", f"R$ {strategy_budget:,.2f}")
@@ -174,6 +507,32 @@ with st.sidebar:
         format="DD/MM/YYYY"
     )
 
+    if st.session_state.get("token_valid"):
+        st.divider()
+        st.caption(f"Os dados consultados ficam em cache por {MEMO_TTL / 60:.0f} min.")
+        if st.button("Atualizar dados"):
+            refresh_client_data(st.session_state.access_token)
+            st.success("Dados serão buscados novamente.")
+
+def render_debug_panel():
+    """Painel de diagnóstico: latências por endpoint, cache, novas tentativas e tempo de cada etapa."""
+    registry = get_registry()
+    with st.expander("Diagnóstico de desempenho"):
+        st.markdown("**Tempos (histogramas)**")
+        st.dataframe(registry.histograms_frame(), use_container_width=True, hide_index=True)
+        st.markdown("**Contadores**")
+        st.dataframe(registry.counters_frame(), use_container_width=True, hide_index=True)
+        col1, col2 = st.columns(2)
+        col1.download_button("Baixar métricas (Prometheus)", registry.to_prometheus(),
+                             file_name="meli_metrics.prom", mime="text/plain")
+        if col2.button("Zerar métricas"):
+            registry.reset()
+
+def render_tab(stage, render, *args):
+    """Renderiza uma aba registrando o tempo gasto (inclui coleta e montagem dos gráficos)."""
+    with get_registry().timer("meli_stage_seconds", stage=stage):
+        render(*args)
+
 # --- Conteúdo Principal com Abas ---
 st.title("Dashboard de Performance")
 
@@ -183,25 +542,27 @@ if "token_valid" in st.session_state and st.session_state.token_valid:
     ])
 
     with tab1:
-        render_overview_page(st.session_state.access_token, st.session_state.advertiser_id, date_range)
+        render_tab("render_visao_geral", render_overview_page, st.session_state.access_token, st.session_state.advertiser_id, date_range)
 
     with tab2:
-        render_ads_page(st.session_state.access_token, st.session_state.advertiser_id)
+        render_tab("render_ads", render_ads_page, st.session_state.access_token, st.session_state.advertiser_id)
 
     with tab3:
-        st.header("Acompanhamento Diário")
-        st.info("Funcionalidade em desenvolvimento.")
+        render_tab("render_diario", render_daily_page, st.session_state.access_token, st.session_state.advertiser_id, date_range)
 
     with tab4:
-        st.header("Estrela Guia")
-        st.info("Funcionalidade em desenvolvimento.")
+        render_tab("render_estrela_guia", render_goals_page, st.session_state.access_token, st.session_state.advertiser_id)
 
     with tab5:
-        st.header("Projeção")
-        st.info("Funcionalidade em desenvolvimento.")
+        render_tab("render_projecao", render_projection_page, st.session_state.access_token, st.session_state.advertiser_id, date_range)
 else:
     st.info("Por favor, insira e valide as credenciais do cliente na barra lateral para começar.")
 
+with st.sidebar:
+    render_debug_panel()
+# Exporta as métricas para o Prometheus (node_exporter textfile) se MELI_METRICS_FILE estiver definido
+get_registry().write_prometheus()
+
 # Footer
 st.markdown("<br><hr>", unsafe_allow_html=True)
 st.markdown(
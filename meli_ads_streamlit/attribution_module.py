@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation_module import timed_stage
+
+# Somas por item/campanha; TACOS e participação de Ads são recalculados a partir delas
+ATTRIBUTION_SUMS = (
+    "vendas_totais", "unidades_totais", "investimento", "vendas_publicidade",
+    "unidades_publicidade", "vendas_organicas",
+)
+CAMPAIGN_ATTRIBUTION_COLUMNS = ("campaign_id", *ATTRIBUTION_SUMS, "itens", "tacos", "participacao_ads_pct")
+
+def _metric(items_df, name):
+    column = f"metric_{name}"
+    if column not in items_df.columns:
+        return np.zeros(len(items_df))
+    return np.nan_to_num(pd.to_numeric(items_df[column], errors="coerce").to_numpy(dtype=float))
+
+def _with_ratios(df):
+    sales = df["vendas_totais"].where(df["vendas_totais"] > 0)
+    df["tacos"] = df["investimento"] / sales * 100
+    df["participacao_ads_pct"] = df["vendas_publicidade"] / sales * 100
+    return df
+
+@timed_stage("atribuicao_itens")
+def item_attribution(orders, items_df):
+    """Cruza as linhas de pedido (OrderColumns) com os anúncios de `get_items_metrics` pelo item_id.
+
+    Os itens distintos são indexados por item_id (índice com hash) e o
+    vocabulário de itens dos pedidos é resolvido uma única vez; as linhas de
+    pedido válidas são então somadas por item com `bincount`. Um item anunciado
+    em mais de uma campanha tem as vendas totais repartidas entre elas na
+    proporção da receita de publicidade de cada uma (em partes iguais, se
+    nenhuma tiver receita). Retorna uma linha por anúncio (campanha, item) com
+    vendas totais (todas as origens), vendas e investimento de publicidade,
+    vendas orgânicas estimadas e TACOS (investimento / vendas totais, em %).
+    """
+    keys = ["campaign_id", "item_id"] if "campaign_id" in items_df.columns else ["item_id"]
+    items_df = items_df.drop_duplicates(keys).reset_index(drop=True)
+    item_index = pd.Index(items_df["item_id"].unique())
+    n_items = len(item_index)
+    row_item = item_index.get_indexer(items_df["item_id"])
+    positions = item_index.get_indexer(pd.Index(orders.item_ids, dtype=object))
+
+    line_item = positions[orders.item_codes] if len(positions) else np.empty(0, dtype=np.intp)
+    mask = orders.valid[orders.line_order] & (line_item >= 0)
+    line_item = line_item[mask]
+    item_sales = np.bincount(line_item, weights=orders.line_amount()[mask], minlength=n_items)
+    item_units = np.bincount(line_item, weights=orders.item_quantity[mask], minlength=n_items)
+
+    ads_revenue = _metric(items_df, "total_amount")
+    item_ads_revenue = np.bincount(row_item, weights=ads_revenue, minlength=n_items)[row_item]
+    item_campaigns = np.bincount(row_item, minlength=n_items)[row_item]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(item_ads_revenue > 0, ads_revenue / item_ads_revenue, 1 / item_campaigns)
+
+    result = pd.DataFrame({
+        "item_id": items_df["item_id"],
+        "campaign_id": items_df["campaign_id"] if "campaign_id" in items_df.columns else pd.NA,
+        "title": items_df["title"] if "title" in items_df.columns else None,
+        "vendas_totais": item_sales[row_item] * share,
+        "unidades_totais": item_units[row_item] * share,
+        "investimento": _metric(items_df, "cost"),
+        "vendas_publicidade": ads_revenue,
+        "unidades_publicidade": _metric(items_df, "units_quantity"),
+    })
+    result["vendas_organicas"] = np.maximum(result["vendas_totais"] - result["vendas_publicidade"], 0)
+    return _with_ratios(result)
+
+def campaign_attribution(item_attribution_df):
+    """Totais por campanha da atribuição por item, com TACOS e participação de Ads nas vendas."""
+    totals = item_attribution_df.groupby("campaign_id", dropna=True)[list(ATTRIBUTION_SUMS)].sum()
+    totals["itens"] = item_attribution_df.groupby("campaign_id", dropna=True).size()
+    return _with_ratios(totals).reset_index()
+
+def add_tacos(campaigns_df, campaign_attribution_df):
+    """Acrescenta às campanhas `metric_tacos`, vendas totais e vendas orgânicas (NaN sem atribuição)."""
+    attribution = campaign_attribution_df.set_index("campaign_id").reindex(
+        columns=["tacos", "vendas_totais", "vendas_organicas"]
+    )
+    ids = campaigns_df["campaign_id"]
+    campaigns_df = campaigns_df.copy()
+    campaigns_df["metric_tacos"] = ids.map(attribution["tacos"]).astype(float)
+    campaigns_df["vendas_totais"] = ids.map(attribution["vendas_totais"]).astype(float)
+    campaigns_df["vendas_organicas"] = ids.map(attribution["vendas_organicas"]).astype(float)
+    return campaigns_df
@@ -0,0 +1,157 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from meli_ads_collector_module import run_collector
+from data_processor_module import analyze_campaigns, export_consolidated, get_client_advertisers
+from instrumentation_module import get_registry
+
+logger = logging.getLogger(__name__)
+
+def client_advertisers(client):
+    """Anunciantes a coletar de um cliente.
+
+    `client` é um dicionário com `client_name`, `access_token` e, opcionalmente,
+    `advertiser_ids`; sem ele, todos os anunciantes do token são usados.
+    """
+    advertiser_ids = client.get("advertiser_ids")
+    if not advertiser_ids:
+        advertiser_ids = [advertiser_id for advertiser_id, _ in get_client_advertisers(client["access_token"])]
+    return advertiser_ids
+
+def collect_advertiser(access_token, advertiser_id):
+    """Coleta as campanhas de um anunciante (etapa de I/O); retorna (DataFrame, segundos)."""
+    started = time.perf_counter()
+    campaigns_df = run_collector(access_token, advertiser_id)
+    if not campaigns_df.empty:
+        campaigns_df = campaigns_df.assign(advertiser_id=advertiser_id)
+    return campaigns_df, time.perf_counter() - started
+
+def analyze_client(campaigns_df):
+    """Analisa e consolida as campanhas de um cliente (etapa de CPU, roda no pool de processos).
+
+    Retorna também as métricas registradas durante a análise, que ficam no
+    registro do processo filho e precisam ser somadas ao do processo principal.
+    """
+    registry = get_registry()
+    before = registry.snapshot()
+    started = time.perf_counter()
+    consolidated_df = analyze_campaigns(campaigns_df)
+    return consolidated_df, time.perf_counter() - started, registry.since(before)
+
+def run_batch(clients, output_dir="exports", collect_workers=8, analyze_workers=None):
+    """Executa coleta, análise e exportação para vários clientes.
+
+    A coleta roda em paralelo em threads, uma tarefa por anunciante, e a análise
+    em um pool de processos. O tempo de coleta de um cliente é a soma dos tempos
+    de coleta dos seus anunciantes.
+    Retorna um DataFrame com o resumo da execução (tempos por etapa e por cliente).
+    Os nomes de cliente identificam as linhas do resumo e os arquivos gerados,
+    então nomes repetidos são rejeitados.
+    """
+    names = [client["client_name"] for client in clients]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise ValueError(f"Nomes de cliente repetidos no lote: {', '.join(duplicated)}")
+
+    summary = {
+        client["client_name"]: {
+            "client_name": client["client_name"], "status": "ok", "erro": None,
+            "anunciantes": 0, "campanhas": 0,
+            "tempo_coleta_s": None, "tempo_analise_s": None, "tempo_exportacao_s": None,
+            "arquivo": None,
+        }
+        for client in clients
+    }
+    batch_started = time.perf_counter()
+
+    collected = {}
+    with ThreadPoolExecutor(max_workers=collect_workers) as executor:
+        resolving = {client["client_name"]: executor.submit(client_advertisers, client) for client in clients}
+        # Um anunciante por tarefa: clientes com muitos anunciantes não viram a cauda do lote
+        collecting = {}
+        for client in clients:
+            client_name = client["client_name"]
+            try:
+                advertiser_ids = resolving[client_name].result()
+            except Exception as e:
+                logger.error(f"Erro na coleta do cliente {client_name}: {e}")
+                summary[client_name].update(status="erro_coleta", erro=str(e))
+                continue
+            summary[client_name]["anunciantes"] = len(advertiser_ids)
+            collecting[client_name] = [
+                executor.submit(collect_advertiser, client["access_token"], advertiser_id)
+                for advertiser_id in advertiser_ids
+            ]
+
+        for client_name, futures in collecting.items():
+            row = summary[client_name]
+            frames, elapsed = [], 0.0
+            try:
+                for future in futures:
+                    campaigns_df, seconds = future.result()
+                    elapsed += seconds
+                    if not campaigns_df.empty:
+                        frames.append(campaigns_df)
+            except Exception as e:
+                logger.error(f"Erro na coleta do cliente {client_name}: {e}")
+                row.update(status="erro_coleta", erro=str(e))
+                continue
+            campaigns_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            row.update(campanhas=len(campaigns_df), tempo_coleta_s=elapsed)
+            if campaigns_df.empty:
+                row["status"] = "sem_campanhas"
+            else:
+                collected[client_name] = campaigns_df
+
+    with ProcessPoolExecutor(max_workers=analyze_workers) as executor:
+        futures = {executor.submit(analyze_client, df): client_name for client_name, df in collected.items()}
+        for future, client_name in futures.items():
+            row = summary[client_name]
+            try:
+                consolidated_df, elapsed, metrics = future.result()
+                get_registry().merge(metrics)
+                row["tempo_analise_s"] = elapsed
+                started = time.perf_counter()
+                row["arquivo"] = export_consolidated(consolidated_df, client_name, output_dir)
+                row["tempo_exportacao_s"] = time.perf_counter() - started
+            except Exception as e:
+                logger.error(f"Erro na análise do cliente {client_name}: {e}")
+                row.update(status="erro_analise", erro=str(e))
+
+    summary_df = pd.DataFrame(list(summary.values()))
+    logger.info(
+        f"Lote concluído em {time.perf_counter() - batch_started:.1f}s: "
+        f"{(summary_df['status'] == 'ok').sum()} de {len(summary_df)} clientes processados"
+    )
+    return summary_df
+
+def main():
+    """Executa o processamento em lote a partir de um arquivo JSON de clientes."""
+    parser = argparse.ArgumentParser(description="Análise de campanhas em lote para vários clientes.")
+    parser.add_argument("clients_file", help="JSON com a lista de clientes (client_name, access_token, advertiser_ids)")
+    parser.add_argument("--output-dir", default="exports")
+    parser.add_argument("--collect-workers", type=int, default=8)
+    parser.add_argument("--analyze-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.clients_file, encoding="utf-8") as f:
+        clients = json.load(f)
+
+    summary_df = run_batch(clients, args.output_dir, args.collect_workers, args.analyze_workers)
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary_file = os.path.join(args.output_dir, f"resumo_lote_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    summary_df.to_csv(summary_file, index=False)
+    print(summary_df.to_string(index=False))
+    print(f"\nResumo salvo em {summary_file}")
+    metrics_file = get_registry().write_prometheus(os.path.join(args.output_dir, "metrics.prom"))
+    print(f"Métricas de desempenho salvas em {metrics_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark de ponta a ponta contra a API falsa (fake_api_server.py), sem token real.
+
+Mede coleta de pedidos, coleta de campanhas, matching de estratégias,
+consolidação e exportação para cada combinação de tamanhos:
+
+    python benchmark.py --orders 1000 10000 100000 --campaigns 50 500 5000 --latency-ms 30 --rate-429 0.01
+"""
+import argparse
+import logging
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from export_module import available_formats, export_to_bytes
+from fake_api_server import FakeMeliData, FakeMeliServer, ADVERTISER_ID
+from instrumentation_module import get_registry
+from meli_ads_collector_module import ADS_METRICS, MercadoLivreAdsCollector
+from response_cache_module import today_meli
+from strategy_analyzer_module import analyze_and_recommend, consolidate_data
+
+def _timed(timings, stage, func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings[stage] = time.perf_counter() - started
+    return result
+
+def run_scenario(n_orders, n_campaigns, days=30, latency=0.0, rate_429=0.0, max_workers=8, requests_per_second=1000):
+    """Executa um cenário completo e retorna {etapa: segundos} mais contadores de HTTP."""
+    registry = get_registry()
+    registry.reset()
+    data = FakeMeliData(n_orders, n_campaigns, days)
+    with FakeMeliServer(data, latency=latency, rate_429=rate_429) as server:
+        # Sem cache: cada execução mede a coleta completa
+        collector = MercadoLivreAdsCollector(
+            "token-benchmark", max_workers=max_workers, requests_per_second=requests_per_second,
+            use_cache=False, base_url=server.base_url,
+        )
+        collector.session.backoff_base = 0.05
+        date_to = today_meli()
+        date_from = (date_to - timedelta(days=days - 1)).isoformat()
+        timings = {}
+
+        seller_id = collector.get_user_id()
+        orders = _timed(timings, "coleta_pedidos", collector.get_orders_metrics, seller_id, date_from, date_to.isoformat())
+        campaigns_df = _timed(
+            timings, "coleta_campanhas", collector.get_campaigns_dataframe,
+            ADVERTISER_ID, date_from, date_to.isoformat(), metrics=ADS_METRICS,
+        )
+
+    recommended = _timed(timings, "matching", analyze_and_recommend, campaigns_df)
+    consolidated = _timed(timings, "consolidacao", consolidate_data, recommended)
+    for fmt in available_formats():
+        _timed(timings, f"exportacao_{fmt}", export_to_bytes, consolidated, fmt)
+
+    counters = registry.counters_frame()
+    return {
+        "pedidos": n_orders, "campanhas": n_campaigns,
+        "vendas_coletadas": orders["total_de_vendas"],
+        "campanhas_coletadas": len(campaigns_df),
+        **{f"{stage}_s": round(seconds, 4) for stage, seconds in timings.items()},
+        "requisicoes": int(counters.loc[counters["metrica"] == "meli_http_requests_total", "valor"].sum()),
+        "novas_tentativas": int(counters.loc[counters["metrica"] == "meli_http_retries_total", "valor"].sum()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de coleta, análise e exportação contra a API falsa.")
+    parser.add_argument("--orders", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--campaigns", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", help="Arquivo CSV para gravar os resultados")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rows = []
+    for n_orders in args.orders:
+        for n_campaigns in args.campaigns:
+            print(f"Cenário: {n_orders} pedidos, {n_campaigns} campanhas...")
+            rows.append(run_scenario(
+                n_orders, n_campaigns, args.days, args.latency_ms / 1000, args.rate_429, args.workers,
+            ))
+
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\nResultados salvos em {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# Tipos de coluna aceitos pelo ColumnarBuilder
+FLOAT, INT, CATEGORY, DATETIME, TEXT = "float", "int", "category", "datetime", "text"
+
+class _FloatBuffer:
+    """Coluna float64 em um array compacto; valores ausentes ou inválidos viram NaN."""
+
+    def __init__(self):
+        self.values = array("d")
+
+    def append(self, value):
+        try:
+            self.values.append(float(value))
+        except (TypeError, ValueError):
+            self.values.append(np.nan)
+
+    def __len__(self):
+        return len(self.values)
+
+    def to_array(self):
+        return np.frombuffer(self.values, dtype=np.float64) if self.values else np.empty(0, dtype=np.float64)
+
+class _IntBuffer:
+    """Coluna int64; se houver ausentes, vira Int64 (nullable) com máscara."""
+
+    def __init__(self):
+        self.values = array("q")
+        self.missing = bytearray()
+
+    def append(self, value):
+        try:
+            self.values.append(int(value))
+            self.missing.append(0)
+        except (TypeError, ValueError, OverflowError):
+            self.values.append(0)
+            self.missing.append(1)
+
+    def __len__(self):
+        return len(self.values)
+
+    def to_array(self):
+        values = np.frombuffer(self.values, dtype=np.int64) if self.values else np.empty(0, dtype=np.int64)
+        mask = np.frombuffer(self.missing, dtype=np.bool_) if self.missing else np.empty(0, dtype=np.bool_)
+        if mask.any():
+            return pd.arrays.IntegerArray(values.copy(), mask.copy())
+        return values
+
+class _CategoryBuffer:
+    """Coluna categórica codificada à medida que os registros chegam."""
+
+    def __init__(self):
+        self.codes = array("i")
+        self.categories = {}
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.categories.get(value)
+        if code is None:
+            code = self.categories[value] = len(self.categories)
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def to_array(self):
+        codes = np.frombuffer(self.codes, dtype=np.int32) if self.codes else np.empty(0, dtype=np.int32)
+        return pd.Categorical.from_codes(codes, categories=list(self.categories))
+
+class _DatetimeBuffer:
+    """Coluna de datas ISO 8601, convertida de uma só vez para datetime64 (UTC)."""
+
+    def __init__(self):
+        self.values = []
+
+    def append(self, value):
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def to_array(self):
+        return pd.to_datetime(pd.Series(self.values, dtype=object), utc=True, errors="coerce", format="ISO8601")
+
+class _TextBuffer:
+    def __init__(self):
+        self.values = []
+
+    def append(self, value):
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def to_array(self):
+        return self.values
+
+_BUFFERS = {FLOAT: _FloatBuffer, INT: _IntBuffer, CATEGORY: _CategoryBuffer, DATETIME: _DatetimeBuffer, TEXT: _TextBuffer}
+
+class ColumnarBuilder:
+    """Acumula registros da API diretamente em buffers tipados por coluna.
+
+    `fields` mapeia o nome da coluna para (chave no JSON, tipo). O dicionário
+    `metrics` de cada registro é achatado em colunas float64 `metric_*`, na ordem
+    em que as métricas aparecem.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.buffers = {column: _BUFFERS[kind]() for column, (_, kind) in fields.items()}
+        self.n_rows = 0
+
+    def append(self, record):
+        for column, (key, _) in self.fields.items():
+            self.buffers[column].append(record.get(key))
+        for metric_name, metric_value in (record.get("metrics") or {}).items():
+            column = f"metric_{metric_name}"
+            buffer = self.buffers.get(column)
+            if buffer is None:
+                buffer = self.buffers[column] = _FloatBuffer()
+                for _ in range(self.n_rows):
+                    buffer.append(None)
+            buffer.append(metric_value)
+        self.n_rows += 1
+        for buffer in self.buffers.values():
+            if len(buffer) < self.n_rows:
+                buffer.append(None)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def to_dataframe(self):
+        if not self.n_rows:
+            return pd.DataFrame()
+        return pd.DataFrame({column: buffer.to_array() for column, buffer in self.buffers.items()})
@@ -1,36 +1,135 @@
 import pandas as pd
-from datetime import datetime
+from collections import OrderedDict
+import asyncio
+import functools
 import os
+import threading
+import time
 
 # Importar o coletor
-from meli_ads_collector_module import MercadoLivreAdsCollector
+from meli_ads_collector_module import AsyncMercadoLivreAdsCollector, get_collector, run_collector, run_sync, run_attribution_collector
+from attribution_module import CAMPAIGN_ATTRIBUTION_COLUMNS, add_tacos, campaign_attribution, item_attribution
+from export_module import export_to_file
+from goals_module import get_default_goals_store, month_to_date
+from response_cache_module import get_default_cache, token_namespace
 from strategy_analyzer_module import analyze_and_recommend, consolidate_data
 
+# Validade (segundos) dos resultados memoizados das funções de dados
+MEMO_TTL = float(os.environ.get("MELI_MEMO_TTL_SECONDS", "300"))
+MEMO_MAX_ENTRIES = 256
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+def _memoize(ttl=MEMO_TTL, cache_if=lambda result: result is not None):
+    """Memoiza o resultado por (função, hash do token, demais argumentos), com TTL.
+
+    O token nunca entra na chave em claro, então clientes diferentes não
+    compartilham entradas. Resultados reprovados por `cache_if` (erros) não são
+    guardados. `refresh=True` ignora a entrada existente e a substitui.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(access_token, *args, refresh=False):
+            key = (func.__name__, token_namespace(access_token), args)
+            now = time.monotonic()
+            if not refresh:
+                with _memo_lock:
+                    entry = _memo.get(key)
+                    if entry is not None and entry[0] > now:
+                        _memo.move_to_end(key)
+                        return entry[1]
+            result = func(access_token, *args)
+            if cache_if(result):
+                with _memo_lock:
+                    _memo[key] = (now + ttl, result)
+                    _memo.move_to_end(key)
+                    while len(_memo) > MEMO_MAX_ENTRIES:
+                        _memo.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
+
+def invalidate_cached_results(access_token=None):
+    """Descarta os resultados memoizados (todos ou apenas os de um token)."""
+    with _memo_lock:
+        if access_token is None:
+            _memo.clear()
+            return
+        namespace = token_namespace(access_token)
+        for key in [k for k in _memo if k[1] == namespace]:
+            del _memo[key]
+
+def refresh_client_data(access_token):
+    """Força nova busca dos dados de um cliente: limpa a memoização e as respostas ainda não definitivas do cache."""
+    invalidate_cached_results(access_token)
+    get_default_cache().clear(token_namespace(access_token), keep_permanent=True)
+
+def analyze_campaigns(campaigns_df):
+    """Gera as recomendações e consolida os dados das campanhas."""
+    campaigns_with_recommendations = analyze_and_recommend(campaigns_df)
+    return consolidate_data(campaigns_with_recommendations)
+
+def export_consolidated(consolidated_df, client_name, output_dir=None, fmt="xlsx"):
+    """Grava a planilha consolidada (em `MELI_EXPORT_DIR` se `output_dir` não for informado) e retorna o caminho."""
+    return export_to_file(consolidated_df, f"{client_name}_analise_campanhas", fmt, output_dir)
+
 def process_and_export(campaigns_df, client_name):
     """Processa os dados das campanhas e gera a planilha final."""
-    campaigns_with_recommendations = analyze_and_recommend(campaigns_df)
-    consolidated_df = consolidate_data(campaigns_with_recommendations)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{client_name}_analise_campanhas_{timestamp}.xlsx"
-    consolidated_df.to_excel(filename, index=False)
+    consolidated_df = analyze_campaigns(campaigns_df)
+    filename = export_consolidated(consolidated_df, client_name)
     return filename, consolidated_df
 
-def get_client_data(access_token):
-    """Obtém dados básicos do cliente através da API."""
-    collector = MercadoLivreAdsCollector(access_token)
+def get_campaign_attribution(access_token, advertiser_id):
+    """Cruza os pedidos dos últimos 30 dias com os anúncios do anunciante; retorna (por item, por campanha)."""
+    orders, items_df = run_attribution_collector(access_token, advertiser_id)
+    if items_df.empty:
+        return items_df, pd.DataFrame(columns=list(CAMPAIGN_ATTRIBUTION_COLUMNS))
+    items = item_attribution(orders, items_df)
+    return items, campaign_attribution(items)
+
+def collect_and_process(access_token, advertiser_id, progress=None, with_tacos=False):
+    """Coleta e analisa as campanhas de um anunciante, informando o andamento via `progress`.
+
+    Com `with_tacos`, os pedidos dos mesmos 30 dias são cruzados com os anúncios
+    e o TACOS de cada campanha entra na recomendação. Retorna o DataFrame
+    consolidado (vazio se não houver campanhas); nada é gravado em disco.
+    Pensada para rodar em segundo plano (ver job_runner_module).
+    """
+    report = progress or (lambda **kwargs: None)
+    report(stage="Coletando campanhas")
+    campaigns_df = run_collector(access_token, advertiser_id, progress=progress)
+    if campaigns_df.empty:
+        return campaigns_df
+    if with_tacos:
+        report(stage="Cruzando pedidos e anúncios")
+        _, campaigns_attribution = get_campaign_attribution(access_token, advertiser_id)
+        campaigns_df = add_tacos(campaigns_df, campaigns_attribution)
+    report(stage="Analisando campanhas")
+    return analyze_campaigns(campaigns_df)
+
+@_memoize(cache_if=bool)
+def get_client_advertisers(access_token):
+    """Lista todos os anunciantes do cliente como pares (advertiser_id, advertiser_name)."""
+    collector = get_collector(access_token)
     advertisers_data = collector.get_advertisers()
     if not advertisers_data or not advertisers_data.get("advertisers"):
+        return []
+    return [(a["advertiser_id"], a["advertiser_name"]) for a in advertisers_data["advertisers"]]
+
+def get_client_data(access_token):
+    """Obtém dados básicos do cliente através da API."""
+    advertisers = get_client_advertisers(access_token)
+    if not advertisers:
         return None, None
-    first_advertiser = advertisers_data["advertisers"][0]
-    advertiser_id = first_advertiser["advertiser_id"]
-    advertiser_name = first_advertiser["advertiser_name"]
-    return advertiser_id, advertiser_name
+    return advertisers[0]
 
+@_memoize()
 def get_business_metrics(access_token, date_from, date_to):
     """Obtém as métricas de negócio para um determinado período."""
     if not access_token: return None
     try:
-        collector = MercadoLivreAdsCollector(access_token)
+        collector = get_collector(access_token)
         seller_id = collector.get_user_id()
         if not seller_id:
             print("Não foi possível obter o ID do vendedor.")
@@ -41,13 +140,145 @@ def get_business_metrics(access_token, date_from, date_to):
         print(f"Erro ao buscar métricas de negócio: {e}")
         return None
 
+@_memoize()
+def get_daily_business_metrics(access_token, date_from, date_to):
+    """Obtém as métricas de negócio dia a dia para um determinado período."""
+    if not access_token: return None
+    try:
+        collector = get_collector(access_token)
+        seller_id = collector.get_user_id()
+        if not seller_id:
+            print("Não foi possível obter o ID do vendedor.")
+            return None
+        return collector.get_orders_daily(seller_id, date_from.strftime('%Y-%m-%d'), date_to.strftime('%Y-%m-%d'))
+    except Exception as e:
+        print(f"Erro ao buscar métricas diárias de negócio: {e}")
+        return None
+
+@_memoize()
+def get_orders_table(access_token, date_from, date_to):
+    """Obtém os pedidos do período em colunas compactas (OrderColumns), para análises por status e item."""
+    if not access_token: return None
+    try:
+        collector = get_collector(access_token)
+        seller_id = collector.get_user_id()
+        if not seller_id:
+            print("Não foi possível obter o ID do vendedor.")
+            return None
+        return collector.get_orders_columns(seller_id, date_from.strftime('%Y-%m-%d'), date_to.strftime('%Y-%m-%d'))
+    except Exception as e:
+        print(f"Erro ao buscar pedidos: {e}")
+        return None
+
+@_memoize()
+def get_daily_ads_metrics(access_token, advertiser_id, date_from, date_to):
+    """Obtém as métricas de publicidade por campanha e por dia para um determinado período."""
+    if not access_token or not advertiser_id: return None
+    try:
+        collector = get_collector(access_token)
+        return collector.get_campaigns_daily(advertiser_id, date_from.strftime('%Y-%m-%d'), date_to.strftime('%Y-%m-%d'))
+    except Exception as e:
+        print(f"Erro ao buscar métricas diárias de publicidade: {e}")
+        return None
+
+def get_campaign_trend(access_token, advertiser_id, date_from, date_to, metric="acos", campaign_ids=None):
+    """Série diária de uma métrica por campanha (dia x campanha), lida do histórico local.
+
+    O histórico é preenchido por `get_daily_ads_metrics`; chame-o antes para o período.
+    """
+    if not access_token or not advertiser_id: return None
+    try:
+        trend = get_collector(access_token).warehouse.trend(
+            advertiser_id, date_from.strftime('%Y-%m-%d'), date_to.strftime('%Y-%m-%d'), metric=metric
+        )
+        if campaign_ids is not None:
+            trend = trend.reindex(columns=[str(c) for c in campaign_ids])
+        return trend
+    except Exception as e:
+        print(f"Erro ao ler a tendência de {metric}: {e}")
+        return None
+
+@_memoize()
 def get_ads_overview_metrics(access_token, advertiser_id, date_from, date_to):
     """Obtém as métricas de publicidade para um determinado período."""
     if not access_token or not advertiser_id: return None
     try:
-        collector = MercadoLivreAdsCollector(access_token)
+        collector = get_collector(access_token)
         metrics = collector.get_ads_summary_metrics(advertiser_id, date_from.strftime('%Y-%m-%d'), date_to.strftime('%Y-%m-%d'))
         return metrics
     except Exception as e:
         print(f"Erro ao buscar métricas de publicidade: {e}")
-        return None
\ No newline at end of file
+        return None
+
+@_memoize(cache_if=bool)
+def get_seller_id(access_token):
+    """ID do vendedor do token; identifica o cliente nas metas e acumulados, já que o token é renovado."""
+    if not access_token: return None
+    try:
+        return get_collector(access_token).get_user_id()
+    except Exception as e:
+        print(f"Erro ao obter o ID do vendedor: {e}")
+        return None
+
+@_memoize()
+def get_month_to_date_metrics(access_token, advertiser_id):
+    """Totais do mês corrente até hoje (pedidos e publicidade), a partir do acumulado da Estrela Guia."""
+    if not access_token: return None
+    try:
+        collector = get_collector(access_token)
+        seller_id = get_seller_id(access_token)
+        if not seller_id:
+            print("Não foi possível obter o ID do vendedor.")
+            return None
+        return month_to_date(collector, seller_id, advertiser_id)
+    except Exception as e:
+        print(f"Erro ao buscar o acumulado do mês: {e}")
+        return None
+
+def get_monthly_targets(access_token, month):
+    """Metas do cliente para o mês (`YYYY-MM`); vazio se o vendedor não puder ser identificado."""
+    seller_id = get_seller_id(access_token)
+    if not seller_id:
+        return {}
+    return get_default_goals_store().get_targets(str(seller_id), month)
+
+def save_monthly_targets(access_token, month, targets):
+    """Grava as metas do cliente para o mês (`YYYY-MM`); retorna False se o vendedor não puder ser identificado."""
+    seller_id = get_seller_id(access_token)
+    if not seller_id:
+        return False
+    get_default_goals_store().set_targets(str(seller_id), month, targets)
+    return True
+
+@_memoize(cache_if=lambda result: None not in result)
+def get_overview_metrics(access_token, advertiser_id, date_from, date_to):
+    """Obtém as métricas de negócio e de publicidade do período em paralelo.
+
+    Retorna a tupla (business_metrics, ads_metrics); cada item é None em caso de erro.
+    """
+    if not access_token: return None, None
+    collector = AsyncMercadoLivreAdsCollector(get_collector(access_token))
+    date_from_str, date_to_str = date_from.strftime('%Y-%m-%d'), date_to.strftime('%Y-%m-%d')
+
+    async def fetch_business():
+        seller_id = await collector.get_user_id()
+        if not seller_id:
+            print("Não foi possível obter o ID do vendedor.")
+            return None
+        return await collector.get_orders_metrics(seller_id, date_from_str, date_to_str)
+
+    async def fetch_ads():
+        if not advertiser_id: return None
+        return await collector.get_ads_summary_metrics(advertiser_id, date_from_str, date_to_str)
+
+    async def fetch_all():
+        return await asyncio.gather(fetch_business(), fetch_ads(), return_exceptions=True)
+
+    business_metrics, ads_metrics = run_sync(fetch_all())
+    if isinstance(business_metrics, Exception):
+        print(f"Erro ao buscar métricas de negócio: {business_metrics}")
+        business_metrics = None
+    if isinstance(ads_metrics, Exception):
+        print(f"Erro ao buscar métricas de publicidade: {ads_metrics}")
+        ads_metrics = None
+    return business_metrics, ads_metrics
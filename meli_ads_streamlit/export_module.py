@@ -0,0 +1,141 @@
+import io
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from instrumentation_module import timed_stage
+from response_cache_module import MELI_TZ
+
+try:
+    import xlsxwriter
+except ImportError:  # opcional: sem ele o XLSX é gravado pelo openpyxl
+    xlsxwriter = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # opcional: necessário apenas para Parquet
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = os.environ.get("MELI_EXPORT_DIR", "exports")
+# Linhas convertidas por vez ao gravar CSV e XLSX
+CHUNK_ROWS = 10_000
+
+MIME_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "json": "application/json",
+}
+
+def available_formats():
+    """Formatos suportados no ambiente atual (Parquet depende do pyarrow)."""
+    return [fmt for fmt in MIME_TYPES if fmt != "parquet" or pq is not None]
+
+def _local_datetimes(df):
+    """Converte datas com fuso para o horário local da API, sem fuso (o Excel não aceita fusos)."""
+    tz_columns = [c for c in df.columns if isinstance(df[c].dtype, pd.DatetimeTZDtype)]
+    if not tz_columns:
+        return df
+    return df.assign(**{c: df[c].dt.tz_convert(MELI_TZ).dt.tz_localize(None) for c in tz_columns})
+
+def _as_frames(data):
+    """Aceita um DataFrame ou um iterável de DataFrames (ex.: páginas de uma coleta)."""
+    if isinstance(data, pd.DataFrame):
+        return [data]
+    return data
+
+def _write_csv(frames, target):
+    header = True
+    for df in frames:
+        df.to_csv(target, index=False, header=header, chunksize=CHUNK_ROWS)
+        header = False
+
+def _write_json(frames, target):
+    df = pd.concat(list(frames), ignore_index=True)
+    df.to_json(target, orient="records", indent=2, force_ascii=False)
+
+def _write_parquet(frames, target):
+    if pq is None:
+        raise ValueError("O formato 'parquet' requer o pacote pyarrow")
+    writer = None
+    try:
+        for df in frames:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _write_xlsx(frames, target):
+    if xlsxwriter is None:
+        pd.concat([_local_datetimes(df) for df in frames], ignore_index=True).to_excel(target, index=False)
+        return
+    # constant_memory grava linha a linha e descarta cada linha concluída
+    workbook = xlsxwriter.Workbook(target, {
+        "constant_memory": True, "in_memory": False,
+        "default_date_format": "dd/mm/yyyy hh:mm:ss", "nan_inf_to_errors": True,
+    })
+    try:
+        worksheet = workbook.add_worksheet()
+        row = 0
+        for df in frames:
+            if row == 0:
+                worksheet.write_row(0, 0, [str(c) for c in df.columns])
+                row = 1
+            df = _local_datetimes(df)
+            for start in range(0, len(df), CHUNK_ROWS):
+                chunk = df.iloc[start:start + CHUNK_ROWS].astype(object)
+                chunk = chunk.where(chunk.notna(), None)
+                for values in chunk.itertuples(index=False, name=None):
+                    worksheet.write_row(row, 0, values)
+                    row += 1
+    finally:
+        workbook.close()
+
+_WRITERS = {"xlsx": _write_xlsx, "csv": _write_csv, "parquet": _write_parquet, "json": _write_json}
+
+@timed_stage("exportacao")
+def write_export(data, target, fmt="xlsx"):
+    """Grava `data` (DataFrame ou iterável de DataFrames) em `target` (caminho ou buffer binário)."""
+    writer = _WRITERS.get(fmt)
+    if writer is None:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+    if fmt in ("csv", "json"):
+        # pandas grava texto nesses formatos; arquivos e buffers binários recebem UTF-8
+        if isinstance(target, (str, os.PathLike)):
+            with open(target, "w", encoding="utf-8", newline="") as text:
+                writer(_as_frames(data), text)
+            return
+        text = io.TextIOWrapper(target, encoding="utf-8", newline="")
+        try:
+            writer(_as_frames(data), text)
+        finally:
+            text.flush()
+            text.detach()
+        return
+    writer(_as_frames(data), target)
+
+def export_to_bytes(data, fmt="xlsx"):
+    """Gera o arquivo em memória, pronto para `st.download_button`."""
+    buffer = io.BytesIO()
+    write_export(data, buffer, fmt)
+    return buffer.getvalue()
+
+def export_to_file(data, basename, fmt="xlsx", output_dir=None):
+    """Grava `<output_dir>/<basename>_<timestamp>.<fmt>` e retorna o caminho.
+
+    Sem `output_dir`, usa `MELI_EXPORT_DIR` (padrão `exports/`).
+    """
+    output_dir = output_dir or DEFAULT_EXPORT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{basename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}")
+    write_export(data, path, fmt)
+    logger.info(f"Dados exportados para {path}")
+    return path
@@ -0,0 +1,226 @@
+"""Servidor local que imita os endpoints da API do Mercado Livre usados pelo coletor.
+
+Gera pedidos, campanhas e anúncios sintéticos (determinísticos pela semente) e
+permite injetar latência e respostas 429, para medir desempenho sem token real:
+
+    python fake_api_server.py --orders 20000 --campaigns 500 --latency-ms 80 --rate-429 0.02
+    MELI_API_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+"""
+import argparse
+import bisect
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SELLER_ID = 123456789
+ADVERTISER_ID = 1001
+API_TZ = timezone(timedelta(hours=-3))
+
+ORDER_STATUSES = ("paid", "paid", "paid", "shipped", "delivered", "cancelled", "pending")
+CAMPAIGN_NAMES = (
+    "01A - Hig Perforrmance Stage1", "Aceleração dinamica 850/22", "Alavanca Full",
+    "Anuncio Novo Stage2", "Recorrencia de vendas", "Campanha Genérica",
+)
+ADS_ROUTE = re.compile(r"^/advertising/advertisers/(\d+)/product_ads/(campaigns|ads/search)$")
+
+def _window_days(params):
+    """Número de dias da janela `date_from`/`date_to` (mínimo 1)."""
+    try:
+        date_from = datetime.strptime(params["date_from"][:10], "%Y-%m-%d")
+        date_to = datetime.strptime(params["date_to"][:10], "%Y-%m-%d")
+    except (KeyError, ValueError):
+        return 1
+    return max(1, (date_to - date_from).days + 1)
+
+class FakeMeliData:
+    """Dados sintéticos: pedidos ordenados por data e campanhas/anúncios com métricas diárias."""
+
+    def __init__(self, n_orders=10_000, n_campaigns=200, days=90, items_per_campaign=3, seed=42):
+        rng = random.Random(seed)
+        now = datetime.now(API_TZ)
+        self.orders = []
+        for i in range(n_orders):
+            created = now - timedelta(seconds=rng.uniform(0, days * 86400))
+            self.orders.append({
+                "id": 2000000000 + i,
+                "status": rng.choice(ORDER_STATUSES),
+                "date_created": created.isoformat(timespec="milliseconds"),
+                "total_amount": round(rng.uniform(20, 600), 2),
+                "order_items": [
+                    {
+                        "item": {"id": f"MLB{rng.randint(1, n_campaigns * items_per_campaign)}"},
+                        "quantity": rng.randint(1, 3), "unit_price": round(rng.uniform(20, 300), 2),
+                    }
+                    for _ in range(rng.choice((1, 1, 1, 2)))
+                ],
+            })
+        self.orders.sort(key=lambda order: order["date_created"])
+        self.order_dates = [order["date_created"] for order in self.orders]
+
+        self.campaigns = []
+        for i in range(n_campaigns):
+            clicks = rng.randint(0, 200)
+            revenue = rng.uniform(0, 3000)
+            self.campaigns.append({
+                "id": 300000 + i,
+                "name": f"{rng.choice(CAMPAIGN_NAMES)} #{i}",
+                "status": "active" if rng.random() < 0.7 else "paused",
+                "budget": float(rng.choice((15, 50, 850, 1000, 1800, 5000, 20000))),
+                "currency_id": "BRL",
+                "date_created": (now - timedelta(days=rng.randint(30, 400))).isoformat(timespec="seconds"),
+                "last_updated": now.isoformat(timespec="seconds"),
+                "acos_target": float(rng.choice((5, 8, 20, 45))),
+                "strategy": rng.choice(("PROFITABILITY", "INCREASE", "VISIBILITY")),
+                "channel": "marketplace",
+                "_daily": {
+                    "clicks": clicks, "prints": clicks * rng.randint(20, 80), "cost": clicks * rng.uniform(0.3, 2.0),
+                    "units_quantity": rng.randint(0, 20), "direct_items_quantity": rng.randint(0, 10),
+                    "indirect_items_quantity": rng.randint(0, 5), "organic_units_quantity": rng.randint(0, 30),
+                    "direct_amount": revenue * 0.8, "indirect_amount": revenue * 0.2, "total_amount": revenue,
+                },
+            })
+        self.items = [
+            {
+                "item_id": f"MLB{i * items_per_campaign + j + 1}", "campaign_id": campaign["id"],
+                "title": f"Produto {i * items_per_campaign + j + 1}", "status": campaign["status"],
+                "price": round(rng.uniform(20, 600), 2), "channel": "marketplace",
+                "listing_type_id": "gold_special", "logistic_type": "fulfillment",
+                "_daily": {k: v / items_per_campaign for k, v in campaign["_daily"].items()},
+            }
+            for i, campaign in enumerate(self.campaigns) for j in range(items_per_campaign)
+        ]
+
+    def orders_page(self, date_from, date_to, offset, limit):
+        """Pedidos da janela em ordem decrescente de data (como `sort=date_desc`)."""
+        lo = bisect.bisect_left(self.order_dates, date_from)
+        hi = bisect.bisect_right(self.order_dates, date_to)
+        start, stop = max(lo, hi - offset - limit), max(lo, hi - offset)
+        return self.orders[start:stop][::-1], hi - lo
+
+def _with_metrics(record, n_days, metrics):
+    out = {k: v for k, v in record.items() if k != "_daily"}
+    daily = record["_daily"]
+    values = {k: v * n_days for k, v in daily.items()}
+    values["ctr"] = values["clicks"] / values["prints"] * 100 if values["prints"] else 0
+    values["cpc"] = values["cost"] / values["clicks"] if values["clicks"] else 0
+    values["acos"] = values["cost"] / values["total_amount"] * 100 if values["total_amount"] else 0
+    out["metrics"] = {m: values[m] for m in metrics if m in values}
+    return out
+
+class FakeMeliHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        config = self.server.config
+        if config["latency"]:
+            time.sleep(max(0.0, random.gauss(config["latency"], config["latency"] * 0.2)))
+        if not self.headers.get("Authorization"):
+            return self._send(401, {"message": "invalid_token"})
+        if config["rate_429"] and random.random() < config["rate_429"]:
+            headers = {"Retry-After": str(config["retry_after"])} if config["retry_after"] else None
+            return self._send(429, {"message": "too_many_requests"}, headers)
+
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        data = self.server.data
+        limit, offset = int(params.get("limit", 50)), int(params.get("offset", 0))
+        metrics = params.get("metrics", "").split(",") if params.get("metrics") else []
+
+        if url.path == "/users/me":
+            return self._send(200, {"id": SELLER_ID, "nickname": "VENDEDOR_TESTE"})
+        if url.path == "/orders/search":
+            results, total = data.orders_page(
+                params.get("order.date_created.from", ""), params.get("order.date_created.to", "9999"), offset, limit
+            )
+            return self._send(200, {"results": results, "paging": {"total": total, "offset": offset, "limit": limit}})
+        if url.path == "/advertising/advertisers":
+            return self._send(200, {"advertisers": [{"advertiser_id": ADVERTISER_ID, "advertiser_name": "Anunciante Teste"}]})
+
+        match = ADS_ROUTE.match(url.path)
+        if match:
+            n_days = _window_days(params)
+            records = data.campaigns if match.group(2) == "campaigns" else data.items
+            if params.get("metrics_summary") == "true":
+                summary = {m: sum(r["_daily"].get(m, 0) for r in data.campaigns) * n_days for m in metrics}
+                if "acos" in summary:
+                    summary["acos"] = summary["cost"] / summary["total_amount"] if summary.get("total_amount") else 0
+                return self._send(200, {"metrics_summary": summary, "paging": {"total": len(data.campaigns)}})
+            page = [_with_metrics(r, n_days, metrics) for r in records[offset:offset + limit]]
+            return self._send(200, {"results": page, "paging": {"total": len(records), "offset": offset, "limit": limit}})
+
+        self._send(404, {"message": "not_found", "path": url.path})
+
+class FakeMeliServer:
+    """Sobe o servidor falso em uma thread; `base_url` aponta para ele."""
+
+    def __init__(self, data=None, host="127.0.0.1", port=0, latency=0.0, rate_429=0.0, retry_after=0):
+        self.httpd = ThreadingHTTPServer((host, port), FakeMeliHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.data = data or FakeMeliData()
+        self.httpd.config = {"latency": latency, "rate_429": rate_429, "retry_after": retry_after}
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API do Mercado Livre.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--campaigns", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90, help="Dias de histórico dos pedidos")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fração das requisições respondidas com 429")
+    parser.add_argument("--retry-after", type=float, default=0, help="Valor do Retry-After nas respostas 429")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    data = FakeMeliData(args.orders, args.campaigns, args.days, seed=args.seed)
+    server = FakeMeliServer(data, args.host, args.port, args.latency_ms / 1000, args.rate_429, args.retry_after)
+    print(f"API falsa em {server.base_url} ({args.orders} pedidos, {args.campaigns} campanhas)")
+    print(f"Use MELI_API_BASE_URL={server.base_url} para apontar o coletor para ela.")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from metrics_warehouse_module import add_derived_metrics
+
+SEASON = 7
+# Métricas de campanha projetadas; ACOS, CTR etc. são derivados das projeções
+FORECAST_METRICS = ("cost", "total_amount", "units_quantity", "clicks", "prints")
+FORECAST_METHODS = {
+    "suavizacao": "Suavização exponencial (tendência amortecida + sazonalidade semanal)",
+    "media_sazonal": "Média sazonal das últimas semanas",
+}
+
+def _weekday_onehot(days, season=SEASON):
+    return np.eye(season)[np.asarray(days.dayofweek) % season]
+
+def _weekday_means(Y, onehot):
+    """Média de cada série por dia da semana: (N, T) x (T, 7) -> (N, 7)."""
+    counts = onehot.sum(axis=0)
+    sums = Y @ onehot
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0), counts
+
+def weekday_index(Y, days, season=SEASON):
+    """Índice sazonal multiplicativo por dia da semana (N, 7); 1 quando não há ao menos duas semanas."""
+    if Y.shape[1] < 2 * season:
+        return np.ones((Y.shape[0], season))
+    means, counts = _weekday_means(Y, _weekday_onehot(days, season))
+    overall = Y.mean(axis=1, keepdims=True)
+    index = np.divide(means, overall, out=np.ones_like(means), where=overall > 0)
+    index[:, counts == 0] = 1.0
+    return index
+
+def holt_damped(Y, horizon, alpha=0.3, beta=0.1, phi=0.9):
+    """Suavização exponencial de Holt com tendência amortecida, ajustada em todas as séries de uma vez.
+
+    O laço percorre apenas o tempo; cada passo atualiza as N séries em bloco.
+    """
+    level = Y[:, 0].astype(float)
+    trend = np.zeros(Y.shape[0])
+    for t in range(1, Y.shape[1]):
+        previous = level
+        level = alpha * Y[:, t] + (1 - alpha) * (previous + phi * trend)
+        trend = beta * (level - previous) + (1 - beta) * phi * trend
+    steps = np.cumsum(phi ** np.arange(1, horizon + 1))
+    return level[:, None] + trend[:, None] * steps[None, :]
+
+def seasonal_average(Y, days, future_days, weeks=4, season=SEASON):
+    """Projeta cada dia futuro pela média do mesmo dia da semana nas últimas `weeks` semanas."""
+    window = min(Y.shape[1], weeks * season)
+    if window < season:
+        return np.repeat(Y.mean(axis=1, keepdims=True), len(future_days), axis=1)
+    means, _ = _weekday_means(Y[:, -window:], _weekday_onehot(days[-window:], season))
+    return means[:, np.asarray(future_days.dayofweek) % season]
+
+def forecast_matrix(Y, days, horizon, method="suavizacao"):
+    """Projeta `horizon` dias para cada linha de Y (N séries x T dias consecutivos).
+
+    Retorna (future_days, F), com F de formato (N, horizon) e valores não negativos.
+    """
+    Y = np.asarray(Y, dtype=float)
+    future_days = pd.date_range(days[-1] + pd.Timedelta(days=1), periods=horizon, freq="D")
+    if method == "media_sazonal":
+        forecast = seasonal_average(Y, days, future_days)
+    elif method == "suavizacao":
+        index = weekday_index(Y, days)
+        weekdays = np.asarray(days.dayofweek) % SEASON
+        history_index = index[:, weekdays]
+        deseasonalized = np.divide(Y, history_index, out=Y.copy(), where=history_index > 0)
+        forecast = holt_damped(deseasonalized, horizon) * index[:, np.asarray(future_days.dayofweek) % SEASON]
+    else:
+        raise ValueError(f"Método de projeção desconhecido: {method}")
+    return future_days, np.clip(forecast, 0, None)
+
+def _daily_matrix(codes, day_positions, values, n_series, n_days):
+    Y = np.zeros((n_series, n_days))
+    np.add.at(Y, (codes, day_positions), np.nan_to_num(np.asarray(values, dtype=float)))
+    return Y
+
+def forecast_campaigns(daily_df, horizon=30, method="suavizacao"):
+    """Projeta as métricas diárias de todas as campanhas a partir da tabela (campanha, dia).
+
+    `daily_df` segue o formato de `get_campaigns_daily` (colunas `campaign_id`,
+    `name`, `day` e métricas). Dias sem registro contam como zero. Retorna a
+    tabela longa projetada, com as métricas derivadas (ACOS, CTR...).
+    """
+    if daily_df.empty:
+        return pd.DataFrame()
+    days = pd.date_range(daily_df["day"].min(), daily_df["day"].max(), freq="D")
+    codes, campaign_ids = pd.factorize(daily_df["campaign_id"])
+    day_positions = (daily_df["day"].to_numpy() - days[0].to_datetime64()) // np.timedelta64(1, "D")
+
+    forecasts = {}
+    for metric in FORECAST_METRICS:
+        Y = _daily_matrix(codes, day_positions, daily_df[metric], len(campaign_ids), len(days))
+        future_days, forecasts[metric] = forecast_matrix(Y, days, horizon, method)
+
+    names = daily_df.groupby("campaign_id", sort=False)["name"].last().reindex(campaign_ids).to_numpy()
+    result = pd.DataFrame({
+        "campaign_id": np.repeat(campaign_ids.to_numpy(), horizon),
+        "name": np.repeat(names, horizon),
+        "day": np.tile(future_days.to_numpy(), len(campaign_ids)),
+        **{metric: forecasts[metric].ravel() for metric in FORECAST_METRICS},
+    })
+    return add_derived_metrics(result)
+
+def account_forecast(campaign_forecast_df):
+    """Totais diários da conta a partir da projeção por campanha."""
+    totals = campaign_forecast_df.groupby("day")[list(FORECAST_METRICS)].sum()
+    return add_derived_metrics(totals)
+
+def forecast_series(df, columns, horizon=30, method="suavizacao", day_column="dia"):
+    """Projeta colunas de uma série diária da conta (ex.: `get_orders_daily`)."""
+    series = df.set_index(day_column)[list(columns)].asfreq("D", fill_value=0)
+    future_days, forecast = forecast_matrix(series.to_numpy().T, series.index, horizon, method)
+    return pd.DataFrame(forecast.T, index=pd.Index(future_days, name=day_column), columns=list(columns))
@@ -0,0 +1,196 @@
+import calendar
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from response_cache_module import DEFAULT_CACHE_DIR, today_meli
+
+logger = logging.getLogger(__name__)
+
+# Métricas acompanhadas na Estrela Guia: nome -> rótulo; ACOS é um teto, as demais são metas de soma
+GOAL_METRICS = {
+    "vendas_brutas": "Faturamento",
+    "total_de_vendas": "Quantidade de Vendas",
+    "unidades_vendidas": "Unidades Vendidas",
+    "ads_cost": "Investimento em Ads",
+    "ads_revenue": "Receita de Ads",
+    "acos": "ACOS (%)",
+}
+CEILING_METRICS = ("acos",)
+# Totais aditivos guardados no acumulado do mês
+ROLLUP_FIELDS = ("vendas_brutas", "total_de_vendas", "unidades_vendidas", "ads_cost", "ads_revenue")
+
+class GoalsStore:
+    """Metas mensais por cliente e acumulados do mês (SQLite).
+
+    O cliente é identificado pelo ID do vendedor, que não muda quando o access
+    token é renovado.
+
+    O acumulado guarda os totais dos dias já encerrados do mês (até `through_day`);
+    o dia corrente é sempre somado na hora, então a aba não varre os pedidos de novo.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "goals.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS monthly_targets (
+                    client TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    target REAL NOT NULL,
+                    PRIMARY KEY (client, month, metric)
+                )"""
+            )
+            self._conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS month_rollups (
+                    client TEXT NOT NULL,
+                    advertiser_id TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    through_day TEXT NOT NULL,
+                    {', '.join(f'{f} REAL NOT NULL' for f in ROLLUP_FIELDS)},
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (client, advertiser_id, month)
+                )"""
+            )
+
+    def get_targets(self, client, month):
+        """Metas do mês ({métrica: valor})."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT metric, target FROM monthly_targets WHERE client = ? AND month = ?", (client, month)
+            ).fetchall()
+        return dict(rows)
+
+    def set_targets(self, client, month, targets):
+        """Grava as metas do mês; valores None ou zero removem a meta."""
+        with self._lock, self._conn:
+            for metric, target in targets.items():
+                if not target:
+                    self._conn.execute(
+                        "DELETE FROM monthly_targets WHERE client = ? AND month = ? AND metric = ?",
+                        (client, month, metric),
+                    )
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO monthly_targets VALUES (?, ?, ?, ?)",
+                        (client, month, metric, float(target)),
+                    )
+
+    def load_rollup(self, client, advertiser_id, month):
+        """Retorna (through_day, {campo: total}) ou None se ainda não houver acumulado."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT through_day, {', '.join(ROLLUP_FIELDS)} FROM month_rollups "
+                "WHERE client = ? AND advertiser_id = ? AND month = ?",
+                (client, str(advertiser_id), month),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], dict(zip(ROLLUP_FIELDS, row[1:]))
+
+    def save_rollup(self, client, advertiser_id, month, through_day, totals):
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO month_rollups VALUES ({', '.join('?' * (len(ROLLUP_FIELDS) + 5))})",
+                (client, str(advertiser_id), month, str(through_day),
+                 *(float(totals[f]) for f in ROLLUP_FIELDS), time.time()),
+            )
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_default_goals_store():
+    """GoalsStore compartilhado pelo processo, criado sob demanda."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = GoalsStore()
+        return _default_store
+
+def _window_totals(collector, seller_id, advertiser_id, date_from, date_to):
+    """Totais de pedidos e de publicidade de uma janela, no formato de ROLLUP_FIELDS."""
+    orders = collector.get_orders_metrics(seller_id, date_from.isoformat(), date_to.isoformat())
+    totals = {f: orders[f] for f in ("vendas_brutas", "total_de_vendas", "unidades_vendidas")}
+    ads = {}
+    if advertiser_id:
+        ads = collector.get_ads_summary_metrics(advertiser_id, date_from.isoformat(), date_to.isoformat())
+        if ads is None:
+            raise RuntimeError("Falha ao buscar o resumo de publicidade")
+    totals["ads_cost"] = ads.get("cost", 0) or 0
+    totals["ads_revenue"] = ads.get("total_amount", 0) or 0
+    return totals
+
+def month_to_date(collector, seller_id, advertiser_id, store=None, today=None):
+    """Totais do mês até hoje, a partir do acumulado armazenado.
+
+    Apenas os dias encerrados ainda não somados ao acumulado são buscados (e o
+    acumulado é avançado até ontem); o dia corrente é buscado e somado na hora.
+    """
+    store = store or get_default_goals_store()
+    today = today or today_meli()
+    month, month_start, yesterday = today.strftime("%Y-%m"), today.replace(day=1), today - timedelta(days=1)
+
+    closed = dict.fromkeys(ROLLUP_FIELDS, 0.0)
+    if today.day > 1:
+        stored = store.load_rollup(str(seller_id), advertiser_id, month)
+        start = month_start
+        if stored is not None:
+            through_day, closed = stored
+            start = date.fromisoformat(through_day) + timedelta(days=1)
+        if start <= yesterday:
+            logger.info(f"Atualizando acumulado de {month}: {start} a {yesterday}")
+            added = _window_totals(collector, seller_id, advertiser_id, start, yesterday)
+            closed = {f: closed[f] + added[f] for f in ROLLUP_FIELDS}
+            store.save_rollup(str(seller_id), advertiser_id, month, yesterday, closed)
+
+    live = _window_totals(collector, seller_id, advertiser_id, today, today)
+    return {f: closed[f] + live[f] for f in ROLLUP_FIELDS}
+
+def goal_progress(totals, targets, today=None):
+    """Compara os totais do mês com as metas: ritmo, projeção para o fim do mês e ritmo diário necessário.
+
+    Retorna um DataFrame com uma linha por métrica que tem meta.
+    """
+    today = today or today_meli()
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    elapsed, remaining = today.day, days_in_month - today.day
+
+    actual = dict(totals)
+    actual["acos"] = totals["ads_cost"] / totals["ads_revenue"] * 100 if totals["ads_revenue"] else np.nan
+
+    metrics = [m for m in GOAL_METRICS if targets.get(m)]
+    target = np.array([targets[m] for m in metrics], dtype=float)
+    value = np.array([actual[m] for m in metrics], dtype=float)
+    ceiling = np.isin(metrics, CEILING_METRICS)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = target * elapsed / days_in_month
+        pace = np.where(ceiling, target / value * 100, value / expected * 100)
+        projected = np.where(ceiling, value, value / elapsed * days_in_month)
+        required_daily = np.where(
+            ceiling | (remaining == 0), np.nan, np.maximum(target - value, 0) / max(remaining, 1)
+        )
+        completed = np.where(ceiling, np.nan, value / target * 100)
+    on_track = np.where(ceiling, value <= target, projected >= target)
+    return pd.DataFrame({
+        "metrica": metrics,
+        "rotulo": [GOAL_METRICS[m] for m in metrics],
+        "meta": target,
+        "realizado": value,
+        "atingido_pct": completed,
+        "ritmo_pct": pace,
+        "projecao_fim_mes": projected,
+        "necessario_por_dia": required_daily,
+        "no_ritmo": on_track,
+    })
@@ -0,0 +1,160 @@
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from instrumentation_module import endpoint_label, get_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS_PER_SECOND = float(os.environ.get("MELI_REQUESTS_PER_SECOND", "10"))
+DEFAULT_TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class AdaptiveTokenBucket:
+    """Token bucket seguro entre threads que reduz a taxa ao receber 429 e a recupera aos poucos.
+
+    Ao ser limitado, a taxa cai pela metade (até `min_rate`) e, se houver
+    `Retry-After`, todas as threads aguardam o prazo indicado. Cada resposta bem
+    sucedida devolve `recovery` req/s à taxa, até `max_rate`.
+    """
+
+    def __init__(self, rate=DEFAULT_REQUESTS_PER_SECOND, min_rate=0.5, max_rate=None, recovery=0.05):
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = float(rate)
+        self.recovery = recovery
+        self.capacity = max(1.0, self.max_rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self):
+        """Bloqueia até que um token esteja disponível e o consome."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    if waited:
+                        self.waits += 1
+                        self.wait_seconds += waited
+                    return
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def on_throttled(self, retry_after=None):
+        """Reduz a taxa após um 429 e respeita o `Retry-After` informado (segundos)."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        logger.warning(f"Limite de requisições atingido; taxa reduzida para {self.rate:.2f} req/s")
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.recovery)
+
+def parse_retry_after(value):
+    """Converte o cabeçalho `Retry-After` (segundos ou data HTTP) em segundos."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+_shared_rate_limiter = None
+_shared_rate_limiter_lock = threading.Lock()
+
+def get_shared_rate_limiter():
+    """Limitador de taxa único do processo, compartilhado por todos os coletores."""
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = AdaptiveTokenBucket()
+        return _shared_rate_limiter
+
+class ThrottledSession(requests.Session):
+    """Sessão HTTP que passa pelo token bucket e repete 429, 5xx e timeouts com backoff exponencial.
+
+    Quando as tentativas se esgotam, a última resposta é devolvida (e
+    `raise_for_status` a transforma em erro) ou a última exceção é propagada.
+    """
+
+    def __init__(self, rate_limiter=None, max_retries=5, backoff_base=0.5, backoff_max=30.0):
+        super().__init__()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "server_errors": 0, "timeouts": 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _backoff(self, attempt):
+        """Espera exponencial com jitter completo."""
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        registry = get_registry()
+        endpoint = endpoint_label(urlsplit(url).path)
+        attempt = 0
+        while True:
+            with registry.timer("meli_rate_limit_wait_seconds"):
+                self.rate_limiter.acquire()
+            self._count("requests")
+            retry_after = None
+            started = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._count("timeouts")
+                registry.inc("meli_http_requests_total", endpoint=endpoint, status="erro_conexao")
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"Falha de conexão em {url} ({e}); nova tentativa {attempt + 1}")
+            else:
+                registry.observe("meli_http_request_seconds", time.perf_counter() - started, endpoint=endpoint)
+                registry.inc("meli_http_requests_total", endpoint=endpoint, status=response.status_code)
+                registry.inc("meli_http_response_bytes_total", len(response.content), endpoint=endpoint)
+                if response.status_code not in RETRY_STATUSES:
+                    self.rate_limiter.on_success()
+                    return response
+                if response.status_code == 429:
+                    self._count("throttled")
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.rate_limiter.on_throttled(retry_after)
+                else:
+                    self._count("server_errors")
+                if attempt >= self.max_retries:
+                    return response
+                logger.warning(f"HTTP {response.status_code} em {url}; nova tentativa {attempt + 1}")
+            # Com Retry-After o próprio token bucket segura as requisições até o prazo
+            if not retry_after:
+                self._backoff(attempt)
+            attempt += 1
+            self._count("retries")
+            registry.inc("meli_http_retries_total", endpoint=endpoint)
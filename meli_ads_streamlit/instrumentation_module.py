@@ -0,0 +1,209 @@
+import bisect
+import functools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Limites (segundos) dos buckets dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_FILE = os.environ.get("MELI_METRICS_FILE")
+
+# Segmentos variáveis dos caminhos da API (ids numéricos e de itens, ex.: MLB123) viram {id}
+_ID_SEGMENT = re.compile(r"/(?:[A-Z]{3}\d+|\d+)(?=/|$)")
+
+def endpoint_label(path):
+    """Normaliza o caminho da requisição para uso como rótulo (sem ids)."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimativa pelo limite superior do bucket que contém o quantil."""
+        if not self.count:
+            return float("nan")
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class MetricsRegistry:
+    """Contadores e histogramas com rótulos, seguros entre threads.
+
+    Os nomes seguem a convenção do Prometheus (`*_total` para contadores,
+    `*_seconds` para latências) e podem ser exportados em formato texto.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Mede o bloco e registra a duração (segundos) no histograma `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self):
+        """Cópia dos contadores e histogramas em estruturas simples (serializáveis entre processos)."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {key: (list(h.counts), h.count, h.sum) for key, h in self._histograms.items()},
+            }
+
+    def since(self, before):
+        """Métricas registradas depois do `snapshot()` informado, no mesmo formato."""
+        after = self.snapshot()
+        counters = {
+            key: value - before["counters"].get(key, 0)
+            for key, value in after["counters"].items()
+            if value != before["counters"].get(key, 0)
+        }
+        histograms = {}
+        for key, (counts, count, total) in after["histograms"].items():
+            old_counts, old_count, old_total = before["histograms"].get(key, ([0] * len(counts), 0, 0.0))
+            if count != old_count:
+                histograms[key] = ([n - m for n, m in zip(counts, old_counts)], count - old_count, total - old_total)
+        return {"counters": counters, "histograms": histograms}
+
+    def merge(self, snapshot):
+        """Soma ao registro as métricas de um `snapshot()` (ex.: as de um processo filho)."""
+        with self._lock:
+            for key, value in snapshot["counters"].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, (counts, count, total) in snapshot["histograms"].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = _Histogram(self.buckets)
+                histogram.counts = [n + m for n, m in zip(histogram.counts, counts)]
+                histogram.count += count
+                histogram.sum += total
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def counters_frame(self):
+        """Contadores como DataFrame (métrica, rótulos, valor)."""
+        with self._lock:
+            rows = [
+                {"metrica": name, "rotulos": _format_labels(labels), "valor": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return pd.DataFrame(rows, columns=["metrica", "rotulos", "valor"])
+
+    def histograms_frame(self):
+        """Resumo dos histogramas: contagem, total, média e quantis estimados."""
+        with self._lock:
+            rows = [
+                {
+                    "metrica": name, "rotulos": _format_labels(labels), "contagem": h.count,
+                    "total_s": h.sum, "media_s": h.sum / h.count if h.count else float("nan"),
+                    "p50_s": h.quantile(0.5), "p95_s": h.quantile(0.95), "p99_s": h.quantile(0.99),
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+        return pd.DataFrame(rows, columns=["metrica", "rotulos", "contagem", "total_s", "media_s",
+                                           "p50_s", "p95_s", "p99_s"])
+
+    def to_prometheus(self):
+        """Exposição em formato texto do Prometheus."""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels, braces=True)} {value}")
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, labels), h in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(h.buckets + (float("inf"),), h.counts):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        bucket_labels = _format_labels(labels + (("le", le),), braces=True)
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels, braces=True)} {h.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels, braces=True)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=None):
+        """Grava a exposição em `path` (ou `MELI_METRICS_FILE`) de forma atômica; retorna o caminho."""
+        path = path or METRICS_FILE
+        if not path:
+            return None
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+        return path
+
+def _escape_label(value):
+    """Escapa barra invertida, aspas e quebra de linha, como pede o formato texto do Prometheus."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels, braces=False):
+    if braces:
+        text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels)
+        return f"{{{text}}}" if text else ""
+    return ",".join(f'{k}="{v}"' for k, v in labels)
+
+_registry = MetricsRegistry()
+
+def get_registry():
+    """Registro de métricas compartilhado pelo processo."""
+    return _registry
+
+def timed_stage(stage):
+    """Decorador que registra a duração da função em `meli_stage_seconds{stage=...}`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _registry.timer("meli_stage_seconds", stage=stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,129 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from response_cache_module import token_namespace
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get("MELI_JOB_WORKERS", "4"))
+# Por quanto tempo (segundos) um job encerrado continua disponível para ser recuperado
+JOB_RESULT_TTL = float(os.environ.get("MELI_JOB_RESULT_TTL_SECONDS", "3600"))
+
+PENDING, RUNNING, DONE, FAILED = "pendente", "executando", "concluido", "erro"
+
+def job_key(kind, access_token, advertiser_id=None):
+    """Chave de um job: tipo, hash do token e anunciante (nunca o token em claro)."""
+    return kind, token_namespace(access_token), str(advertiser_id)
+
+class Job:
+    """Estado de um job em segundo plano, atualizado pela thread que o executa."""
+
+    def __init__(self, key):
+        self.key = key
+        self.id = uuid.uuid4().hex
+        self.status = PENDING
+        self.stage = None
+        self.pages_done = 0
+        self.pages_total = None
+        self.rows = 0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def report(self, stage=None, pages_done=None, pages_total=None, rows=None):
+        """Callback de progresso: atualiza etapa e contadores de páginas/registros."""
+        with self._lock:
+            if stage is not None:
+                self.stage = stage
+            if pages_done is not None:
+                self.pages_done = pages_done
+            if pages_total is not None:
+                self.pages_total = pages_total
+            if rows is not None:
+                self.rows = rows
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def progress_fraction(self):
+        """Fração concluída da paginação (0 a 1), ou None se o total ainda é desconhecido."""
+        if self.status == DONE:
+            return 1.0
+        if not self.pages_total:
+            return None
+        return min(1.0, self.pages_done / self.pages_total)
+
+class JobRunner:
+    """Executa jobs em um pool de threads do processo do servidor.
+
+    Os jobs são indexados por chave (ver `job_key`), então sobrevivem a reruns e
+    a recarregamentos da página: a sessão recupera o job pela mesma chave. Um
+    novo envio com a chave de um job ainda em andamento devolve o job existente.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, result_ttl=JOB_RESULT_TTL):
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="meli-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args, **kwargs):
+        """Agenda `func(*args, progress=job.report, **kwargs)` e retorna o Job."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and not job.finished:
+                return job
+            job = self._jobs[key] = Job(key)
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        job.status = RUNNING
+        started = time.perf_counter()
+        try:
+            job.result = func(*args, progress=job.report, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            logger.error(f"Erro no job {job.key[0]}: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            logger.info(f"Job {job.key[0]} encerrado ({job.status}) em {time.perf_counter() - started:.1f}s")
+
+    def get(self, key):
+        """Job mais recente da chave, ou None."""
+        with self._lock:
+            self._prune()
+            return self._jobs.get(key)
+
+    def discard(self, key):
+        """Esquece um job encerrado (jobs em andamento não são interrompidos)."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.finished:
+                del self._jobs[key]
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        for key in [k for k, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[key]
+
+_default_runner = None
+_default_runner_lock = threading.Lock()
+
+def get_job_runner():
+    """JobRunner compartilhado pelo processo, criado sob demanda."""
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = JobRunner()
+        return _default_runner
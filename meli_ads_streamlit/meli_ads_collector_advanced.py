@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 import time
 import logging
 
+from export_module import write_export
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -162,12 +164,7 @@ class MercadoLivreAdsCollector:
     def export_to_csv(self, data, filename):
         """Exporta dados para arquivo CSV."""
         try:
-            if isinstance(data, pd.DataFrame):
-                data.to_csv(filename, index=False, encoding='utf-8')
-            else:
-                df = pd.DataFrame(data)
-                df.to_csv(filename, index=False, encoding='utf-8')
-            
+            write_export(data if isinstance(data, pd.DataFrame) else pd.DataFrame(data), filename, "csv")
             logger.info(f"Dados exportados para {filename}")
             return True
             
@@ -178,10 +175,10 @@ class MercadoLivreAdsCollector:
     def export_to_json(self, data, filename):
         """Exporta dados para arquivo JSON."""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                if isinstance(data, pd.DataFrame):
-                    data.to_json(f, orient='records', indent=2, force_ascii=False)
-                else:
+            if isinstance(data, pd.DataFrame):
+                write_export(data, filename, "json")
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
                     json.dump(data, f, indent=2, ensure_ascii=False)
             
             logger.info(f"Dados exportados para {filename}")
@@ -1,113 +1,366 @@
 import requests
-import json
 import pandas as pd
 from datetime import datetime, timedelta
 import time
 import logging
+import threading
+import asyncio
+import itertools
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from response_cache_module import CachedSession, MELI_TZ, get_default_cache, today_meli, token_namespace
+from http_throttle_module import AdaptiveTokenBucket
+from columnar_builder_module import ColumnarBuilder, CATEGORY, DATETIME, FLOAT, INT, TEXT
+from instrumentation_module import get_registry
+from order_store_module import DAY_FIELDS, get_default_order_store
+from order_columns_module import CANCELLED_ORDER_STATUS, VALID_ORDER_STATUSES, OrderColumnsBuilder
+from metrics_warehouse_module import SNAPSHOT_METRICS, MetricsWarehouse, get_default_warehouse
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# URL da API; pode apontar para um servidor local (ex.: fake_api_server.py) em testes e benchmarks
+DEFAULT_BASE_URL = os.environ.get("MELI_API_BASE_URL", "https://api.mercadolibre.com")
+
+# Pool de conexões HTTP compartilhado por todos os coletores do processo
+HTTP_POOL_SIZE = int(os.environ.get("MELI_HTTP_POOL_SIZE", "32"))
+_shared_adapter = None
+_shared_adapter_lock = threading.Lock()
+
+def _parse_json(response):
+    """Decodifica o corpo da resposta, medindo a decodificação à parte do tempo de rede."""
+    with get_registry().timer("meli_stage_seconds", stage="parse_json"):
+        return response.json()
+
+def get_shared_http_adapter():
+    """HTTPAdapter único do processo, para reaproveitar conexões keep-alive entre coletores."""
+    global _shared_adapter
+    with _shared_adapter_lock:
+        if _shared_adapter is None:
+            _shared_adapter = requests.adapters.HTTPAdapter(
+                pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, pool_block=True
+            )
+        return _shared_adapter
+
+class CollectionError(Exception):
+    """Falha definitiva (após as novas tentativas) ao coletar uma página da API."""
+
+class OrdersMetricsAccumulator:
+    """Acumula as métricas de negócio página a página, sem guardar os pedidos."""
+
+    def __init__(self):
+        self.pedidos_processados = 0
+        self.vendas_brutas = 0
+        self.unidades_vendidas = 0
+        self.total_de_vendas = 0
+        self.qtd_vendas_canceladas = 0
+        self.valor_vendas_canceladas = 0
+
+    def add_order(self, order):
+        """Incorpora um pedido aos totais."""
+        self.pedidos_processados += 1
+        status = order.get('status')
+        if status in VALID_ORDER_STATUSES:
+            self.total_de_vendas += 1
+            if 'total_amount' in order:
+                self.vendas_brutas += order['total_amount']
+            for item in order.get('order_items', []):
+                self.unidades_vendidas += item['quantity']
+        elif status == CANCELLED_ORDER_STATUS:
+            self.qtd_vendas_canceladas += 1
+            if 'total_amount' in order:
+                self.valor_vendas_canceladas += order['total_amount']
+
+    def add_orders(self, orders):
+        """Incorpora uma página de pedidos (`results` de `/orders/search`) aos totais."""
+        for order in orders:
+            self.add_order(order)
+
+    def totals(self):
+        """Totais brutos, no formato persistido pelo OrderStore."""
+        return {field: getattr(self, field) for field in DAY_FIELDS}
+
+    def add_totals(self, totals):
+        """Soma totais já agregados (de outro acumulador ou do OrderStore)."""
+        for field in DAY_FIELDS:
+            setattr(self, field, getattr(self, field) + totals[field])
+
+    def to_metrics(self):
+        """Retorna o dicionário de métricas no formato de `get_orders_metrics`."""
+        return {
+            "vendas_brutas": self.vendas_brutas, "unidades_vendidas": self.unidades_vendidas,
+            "total_de_vendas": self.total_de_vendas,
+            "ticket_medio": self.vendas_brutas / self.total_de_vendas if self.total_de_vendas > 0 else 0,
+            "preco_medio_por_unidade": self.vendas_brutas / self.unidades_vendidas if self.unidades_vendidas > 0 else 0,
+            "qtd_vendas_canceladas": self.qtd_vendas_canceladas, "valor_vendas_canceladas": self.valor_vendas_canceladas
+        }
+
+def order_day(order):
+    """Dia (YYYY-MM-DD, fuso da API) em que o pedido foi criado."""
+    date_created = order.get('date_created') or ''
+    try:
+        return datetime.fromisoformat(date_created).astimezone(MELI_TZ).date().isoformat()
+    except ValueError:
+        return date_created[:10]
+
+class DailyOrdersAccumulator:
+    """Acumula as métricas de negócio separadas por dia de criação do pedido."""
+
+    def __init__(self):
+        self.days = {}
+
+    def add_orders(self, orders):
+        for order in orders:
+            day = order_day(order)
+            if day not in self.days:
+                self.days[day] = OrdersMetricsAccumulator()
+            self.days[day].add_order(order)
+
+def date_range_days(date_from, date_to):
+    """Lista de dias (YYYY-MM-DD) entre `date_from` e `date_to`, inclusive."""
+    start = datetime.strptime(str(date_from)[:10], '%Y-%m-%d').date()
+    end = datetime.strptime(str(date_to)[:10], '%Y-%m-%d').date()
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+def contiguous_runs(days):
+    """Agrupa uma lista ordenada de dias em intervalos contíguos (primeiro, último)."""
+    runs = []
+    for day in days:
+        if runs and (datetime.fromisoformat(day) - datetime.fromisoformat(runs[-1][1])).days == 1:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+# Campos das campanhas: coluna -> (chave no JSON, tipo)
+CAMPAIGN_FIELDS = {
+    'campaign_id': ('id', INT), 'name': ('name', TEXT), 'status': ('status', CATEGORY),
+    'budget': ('budget', FLOAT), 'currency_id': ('currency_id', CATEGORY),
+    'date_created': ('date_created', DATETIME), 'last_updated': ('last_updated', DATETIME),
+    'acos_target': ('acos_target', FLOAT), 'strategy': ('strategy', CATEGORY), 'channel': ('channel', CATEGORY),
+}
+
+# Campos dos anúncios (itens) mantidos na tabela de métricas por item
+ITEM_FIELDS = {
+    'item_id': ('item_id', TEXT), 'campaign_id': ('campaign_id', INT), 'title': ('title', TEXT),
+    'status': ('status', CATEGORY), 'price': ('price', FLOAT), 'channel': ('channel', CATEGORY),
+    'listing_type_id': ('listing_type_id', CATEGORY), 'logistic_type': ('logistic_type', CATEGORY),
+}
+
 class MercadoLivreAdsCollector:
     """Coletor de dados de anúncios e métricas do Mercado Livre."""
     
-    def __init__(self, access_token):
+    def __init__(self, access_token, max_workers=4, requests_per_second=None, use_cache=True, cache=None,
+                 order_store=None, warehouse=None, base_url=None):
         self.access_token = access_token
-        self.base_url = "https://api.mercadolibre.com"
-        self.session = requests.Session()
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.max_workers = max(1, int(max_workers))
+        # Sem taxa explícita, usa o limitador compartilhado pelo processo
+        rate_limiter = AdaptiveTokenBucket(requests_per_second) if requests_per_second else None
+        self.session = CachedSession(cache or (get_default_cache() if use_cache else None), rate_limiter=rate_limiter)
+        self.rate_limiter = self.session.rate_limiter
+        self.order_store = order_store or (get_default_order_store() if use_cache else None)
+        # Sem cache, a série diária usa um histórico só em memória
+        self.warehouse = warehouse or (get_default_warehouse() if use_cache else MetricsWarehouse(":memory:"))
+        adapter = get_shared_http_adapter()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
         })
 
+    def _fan_out_pages(self, fetch_page, limit, max_pages=None, progress=None):
+        """Busca a primeira página, lê `paging.total` e busca as demais em paralelo.
+
+        `fetch_page(offset)` deve retornar o JSON da página ou None em caso de erro.
+        As páginas são devolvidas na ordem dos offsets, como no caminho serial;
+        no máximo 2 x `max_workers` páginas ficam em voo ou à espera de consumo.
+        Uma página que falha levanta CollectionError em vez de truncar o resultado.
+        Se informado, `progress(pages_done=..., pages_total=..., rows=...)` é
+        chamado a cada página recebida.
+        """
+        first = fetch_page(0)
+        if first is None:
+            raise CollectionError("Falha ao buscar a página de offset 0")
+        if not first.get('results'):
+            return
+        total = first.get('paging', {}).get('total', 0)
+        if max_pages:
+            total = min(total, max_pages * limit)
+        offsets = range(limit, total, limit)
+        rows = len(first['results'])
+        get_registry().inc("meli_pages_total")
+        if progress:
+            progress(pages_done=1, pages_total=len(offsets) + 1, rows=rows)
+        yield first
+        if not offsets:
+            return
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # Janela limitada de páginas em voo: páginas prontas atrás de uma lenta não se acumulam na memória
+        window = 2 * self.max_workers
+        pending = deque()
+        next_offsets = iter(offsets)
+        try:
+            for offset in itertools.islice(next_offsets, window):
+                pending.append((offset, executor.submit(fetch_page, offset)))
+            page = 1
+            while pending:
+                offset, future = pending.popleft()
+                data = future.result()
+                page += 1
+                for next_offset in itertools.islice(next_offsets, 1):
+                    pending.append((next_offset, executor.submit(fetch_page, next_offset)))
+                if data is None:
+                    raise CollectionError(f"Falha ao buscar a página de offset {offset}")
+                rows += len(data.get('results') or [])
+                get_registry().inc("meli_pages_total")
+                if progress:
+                    progress(pages_done=page, pages_total=len(offsets) + 1, rows=rows)
+                if data.get('results'):
+                    yield data
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self):
+        """Fecha a sessão HTTP sem fechar o pool de conexões compartilhado com os outros coletores."""
+        self.session.adapters.clear()
+        self.session.close()
+
+    def get_http_stats(self):
+        """Contadores da camada HTTP: requisições, novas tentativas, 429s e esperas do limitador."""
+        return {
+            **self.session.stats,
+            "throttle_waits": self.rate_limiter.waits,
+            "throttle_wait_seconds": self.rate_limiter.wait_seconds,
+            "current_rate": self.rate_limiter.rate,
+            "cache_hits": self.session.cache.hits if self.session.cache else 0,
+            "cache_misses": self.session.cache.misses if self.session.cache else 0,
+        }
+
     def get_user_id(self):
         """Obtém o ID do usuário logado."""
         try:
             url = f"{self.base_url}/users/me"
             response = self.session.get(url)
             response.raise_for_status()
-            data = response.json()
+            data = _parse_json(response)
             logger.info(f"ID de usuário obtido: {data.get('id')}")
             return data.get('id')
         except requests.exceptions.RequestException as e:
             logger.error(f"Erro ao obter ID do usuário: {e}")
             return None
 
-    def get_orders_metrics(self, seller_id, date_from, date_to):
-        """Busca pedidos em um intervalo de datas e calcula as métricas de negócio."""
-        all_orders = []
-        offset = 0
+    def _fetch_orders_page(self, seller_id, date_from_str, date_to_str, offset, limit):
+        """Busca uma página de `/orders/search`; retorna None em caso de erro."""
+        logger.info(f"Buscando pedidos... offset: {offset}")
+        url = f"{self.base_url}/orders/search"
+        params = {
+            "seller": seller_id,
+            "order.date_created.from": date_from_str,
+            "order.date_created.to": date_to_str,
+            "limit": limit,
+            "offset": offset,
+            "sort": "date_desc"
+        }
+        try:
+            response = self.session.get(url, params=params)
+            response.raise_for_status()
+            return _parse_json(response)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro ao buscar pedidos (offset {offset}): {e}")
+            return None
+
+    def _fetch_orders_by_day(self, seller_id, date_from, date_to, progress=None):
+        """Busca os pedidos do intervalo na API e os agrega por dia (DailyOrdersAccumulator)."""
+        daily = DailyOrdersAccumulator()
         limit = 50
         
         date_from_str = f"{date_from}T00:00:00.000-03:00"
         date_to_str = f"{date_to}T23:59:59.999-03:00"
 
-        while True:
-            logger.info(f"Buscando pedidos... offset: {offset}")
-            url = f"{self.base_url}/orders/search"
-            params = {
-                "seller": seller_id,
-                "order.date_created.from": date_from_str,
-                "order.date_created.to": date_to_str,
-                "limit": limit,
-                "offset": offset,
-                "sort": "date_desc"
-            }
-            
-            try:
-                response = self.session.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                results = data.get('results', [])
-                if not results:
-                    break
-                
-                all_orders.extend(results)
-                
-                paging = data.get('paging', {})
-                total = paging.get('total', 0)
-                
-                if offset + limit >= total or len(all_orders) >= total:
-                    break
-                
-                offset += limit
-                time.sleep(0.2)
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Erro ao buscar pedidos: {e}")
-                break
-        
-        logger.info(f"Total de {len(all_orders)} pedidos encontrados.")
+        def fetch_page(offset):
+            return self._fetch_orders_page(seller_id, date_from_str, date_to_str, offset, limit)
 
-        if not all_orders:
-            return {
-                "vendas_brutas": 0, "unidades_vendidas": 0, "total_de_vendas": 0, "ticket_medio": 0,
-                "preco_medio_por_unidade": 0, "qtd_vendas_canceladas": 0, "valor_vendas_canceladas": 0
-            }
+        for data in self._fan_out_pages(fetch_page, limit, progress=progress):
+            daily.add_orders(data['results'])
+        return daily
+
+    def _sync_order_days(self, seller_id, date_from, date_to, progress=None):
+        """Retorna {dia: OrdersMetricsAccumulator} do intervalo, buscando na API só os dias não armazenados.
 
-        valid_orders = [o for o in all_orders if o.get('status') in ['paid', 'shipped', 'delivered']]
-        cancelled_orders = [o for o in all_orders if o.get('status') == 'cancelled']
+        Dias encerrados vêm do OrderStore; os demais (incluindo hoje) são buscados
+        em blocos contíguos e gravados em seguida.
+        """
+        days = {}
+        stored = self.order_store.load_closed_days(seller_id, date_from, date_to) if self.order_store else {}
+        for day, totals in stored.items():
+            days[day] = OrdersMetricsAccumulator()
+            days[day].add_totals(totals)
 
-        vendas_brutas = sum(order['total_amount'] for order in valid_orders if 'total_amount' in order)
-        unidades_vendidas = sum(item['quantity'] for order in valid_orders for item in order.get('order_items', []))
-        total_de_vendas = len(valid_orders)
-        ticket_medio = vendas_brutas / total_de_vendas if total_de_vendas > 0 else 0
-        preco_medio_por_unidade = vendas_brutas / unidades_vendidas if unidades_vendidas > 0 else 0
+        missing = [day for day in date_range_days(date_from, date_to) if day not in stored]
+        for run_from, run_to in contiguous_runs(missing):
+            logger.info(f"Buscando pedidos de {run_from} a {run_to} ({len(stored)} dias já armazenados)")
+            fetched = self._fetch_orders_by_day(seller_id, run_from, run_to, progress=progress)
+            run_days = {
+                day: fetched.days.get(day, OrdersMetricsAccumulator())
+                for day in date_range_days(run_from, run_to)
+            }
+            if self.order_store:
+                today = datetime.now(MELI_TZ).date().isoformat()
+                self.order_store.save_days(
+                    seller_id, {day: acc.totals() for day, acc in run_days.items()}, closed_before=today
+                )
+            days.update(run_days)
+        return days
+
+    def get_orders_metrics(self, seller_id, date_from, date_to, progress=None):
+        """Busca pedidos em um intervalo de datas e calcula as métricas de negócio."""
+        accumulator = OrdersMetricsAccumulator()
+        for day_accumulator in self._sync_order_days(seller_id, date_from, date_to, progress).values():
+            accumulator.add_totals(day_accumulator.totals())
         
-        qtd_vendas_canceladas = len(cancelled_orders)
-        valor_vendas_canceladas = sum(order['total_amount'] for order in cancelled_orders if 'total_amount' in order)
-
-        metrics = {
-            "vendas_brutas": vendas_brutas, "unidades_vendidas": unidades_vendidas,
-            "total_de_vendas": total_de_vendas, "ticket_medio": ticket_medio,
-            "preco_medio_por_unidade": preco_medio_por_unidade,
-            "qtd_vendas_canceladas": qtd_vendas_canceladas, "valor_vendas_canceladas": valor_vendas_canceladas
-        }
+        logger.info(f"Total de {accumulator.pedidos_processados} pedidos encontrados.")
+
+        metrics = accumulator.to_metrics()
         logger.info(f"Métricas de negócio calculadas: {metrics}")
         return metrics
 
+    def get_orders_daily(self, seller_id, date_from, date_to, progress=None):
+        """Retorna um DataFrame com as métricas de negócio de cada dia do intervalo."""
+        days = self._sync_order_days(seller_id, date_from, date_to, progress)
+        rows = [{"dia": day, **days[day].to_metrics()} for day in sorted(days)]
+        df = pd.DataFrame(rows)
+        if not df.empty:
+            df["dia"] = pd.to_datetime(df["dia"])
+        return df
+
+    def get_orders_columns(self, seller_id, date_from, date_to, progress=None):
+        """Busca os pedidos do intervalo e os mantém em memória em colunas compactas (OrderColumns).
+
+        Os totais diários obtidos na mesma varredura são gravados no OrderStore.
+        """
+        builder = OrderColumnsBuilder()
+        limit = 50
+        date_from_str = f"{date_from}T00:00:00.000-03:00"
+        date_to_str = f"{date_to}T23:59:59.999-03:00"
+
+        def fetch_page(offset):
+            return self._fetch_orders_page(seller_id, date_from_str, date_to_str, offset, limit)
+
+        for data in self._fan_out_pages(fetch_page, limit, progress=progress):
+            builder.add_orders(data['results'])
+        orders = builder.build()
+        logger.info(f"{len(orders)} pedidos em memória ({orders.nbytes / 1024:.0f} KiB).")
+
+        if self.order_store:
+            today = datetime.now(MELI_TZ).date().isoformat()
+            self.order_store.save_days(seller_id, orders.day_totals(date_from, date_to), closed_before=today)
+        return orders
+
     def get_ads_summary_metrics(self, advertiser_id, date_from, date_to):
         """Busca o resumo de métricas de publicidade para um período."""
         try:
@@ -121,7 +374,7 @@ class MercadoLivreAdsCollector:
             headers = {"Api-Version": "2"}
             response = self.session.get(url, params=params, headers=headers)
             response.raise_for_status()
-            data = response.json()
+            data = _parse_json(response)
             logger.info("Resumo de métricas de publicidade obtido com sucesso.")
             return data.get("metrics_summary", {}) # Retorna o dicionário metrics_summary
         except requests.exceptions.RequestException as e:
@@ -135,7 +388,7 @@ class MercadoLivreAdsCollector:
             params = {"product_id": product_id}
             response = self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = _parse_json(response)
             logger.info(f"Encontrados {len(data.get('advertisers', []))} anunciantes")
             return data
         except requests.exceptions.RequestException as e:
@@ -153,7 +406,7 @@ class MercadoLivreAdsCollector:
                 for key, value in filters.items(): params[f"filters[{key}]"] = value
             response = self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = _parse_json(response)
             logger.info(f"Métricas obtidas para anunciante {advertiser_id}: {data.get('paging', {}).get('total', 0)} campanhas")
             return data
         except requests.exceptions.RequestException as e:
@@ -162,62 +415,227 @@ class MercadoLivreAdsCollector:
     
     def get_all_campaigns_paginated(self, advertiser_id, date_from, date_to, 
                                   metrics=None, filters=None, max_pages=None):
+        """Obtém todas as campanhas, buscando as páginas em paralelo a partir de `paging.total`."""
         all_campaigns = []
-        offset = 0
         limit = 50
-        page = 1
-        while True:
-            if max_pages and page > max_pages: break
-            logger.info(f"Coletando página de campanhas {page}...")
-            data = self.get_campaigns_metrics(
-                advertiser_id, date_from, date_to, 
+
+        def fetch_page(offset):
+            logger.info(f"Coletando página de campanhas {offset // limit + 1}...")
+            return self.get_campaigns_metrics(
+                advertiser_id, date_from, date_to,
                 metrics=metrics, limit=limit, offset=offset, filters=filters
             )
-            if not data or not data.get('results'): break
+
+        for data in self._fan_out_pages(fetch_page, limit, max_pages=max_pages):
             all_campaigns.extend(data['results'])
-            paging = data.get('paging', {})
-            total = paging.get('total', 0)
-            if offset + limit >= total: break
-            offset += limit
-            page += 1
-            time.sleep(0.5)
         logger.info(f"Total de campanhas coletadas: {len(all_campaigns)}")
         return all_campaigns
     
+    def get_campaigns_dataframe(self, advertiser_id, date_from, date_to,
+                                metrics=None, filters=None, max_pages=None, progress=None):
+        """Coleta todas as campanhas gravando cada página direto nas colunas tipadas do DataFrame.
+
+        `progress` recebe o andamento da paginação (ver `_fan_out_pages`). Coletas
+        completas de um único dia, com todas as métricas do histórico, também são
+        gravadas no MetricsWarehouse.
+        """
+        builder = ColumnarBuilder(CAMPAIGN_FIELDS)
+        limit = 50
+
+        def fetch_page(offset):
+            logger.info(f"Coletando página de campanhas {offset // limit + 1}...")
+            return self.get_campaigns_metrics(
+                advertiser_id, date_from, date_to,
+                metrics=metrics, limit=limit, offset=offset, filters=filters
+            )
+
+        registry = get_registry()
+        for data in self._fan_out_pages(fetch_page, limit, max_pages=max_pages, progress=progress):
+            with registry.timer("meli_stage_seconds", stage="montagem_paginas"):
+                builder.extend(data['results'])
+        with registry.timer("meli_stage_seconds", stage="montagem_dataframe"):
+            df = builder.to_dataframe()
+        # Só coletas completas (sem filtros, sem limite de páginas, com todas as métricas do histórico)
+        # marcam o dia como coberto; uma parcial deixaria colunas vazias que não seriam buscadas de novo
+        if (date_from == date_to and not filters and not max_pages
+                and set(SNAPSHOT_METRICS).issubset(metrics or ())):
+            self.warehouse.save_day(advertiser_id, date_from, df, closed=str(date_from) < today_meli().isoformat())
+        logger.info(f"DataFrame de campanhas criado com {len(df)} linhas")
+        return df
+    
+    def get_campaigns_daily(self, advertiser_id, date_from, date_to, metrics=None, progress=None):
+        """Métricas por (campanha, dia) no intervalo, a partir de fatias diárias buscadas em paralelo.
+
+        Dias encerrados já presentes no MetricsWarehouse não são buscados de novo;
+        os demais (incluindo hoje) são coletados dia a dia e gravados no histórico.
+        `progress(pages_done=..., pages_total=...)` conta os dias concluídos.
+        """
+        covered = self.warehouse.covered_days(advertiser_id, date_from, date_to)
+        missing = [day for day in date_range_days(date_from, date_to) if day not in covered]
+        if missing:
+            logger.info(f"Buscando {len(missing)} dias de métricas de campanhas ({len(covered)} já armazenados)")
+
+            # As métricas do histórico são sempre pedidas, para que o dia fique completo no warehouse
+            requested = list(dict.fromkeys([*(metrics or ADS_METRICS), *SNAPSHOT_METRICS]))
+
+            def fetch_day(day):
+                return self.get_campaigns_dataframe(advertiser_id, day, day, metrics=requested)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for done, _ in enumerate(executor.map(fetch_day, missing), start=1):
+                    if progress:
+                        progress(pages_done=done, pages_total=len(missing))
+        return self.warehouse.load_daily(advertiser_id, date_from, date_to)
+
     def campaigns_to_dataframe(self, campaigns_data):
+        """Converte campanhas já coletadas para o DataFrame tipado."""
         if not campaigns_data: return pd.DataFrame()
-        campaigns_list = []
-        for campaign in campaigns_data:
-            campaign_info = {
-                'campaign_id': campaign.get('id'), 'name': campaign.get('name'),
-                'status': campaign.get('status'), 'budget': campaign.get('budget'),
-                'currency_id': campaign.get('currency_id'), 'date_created': campaign.get('date_created'),
-                'last_updated': campaign.get('last_updated'), 'acos_target': campaign.get('acos_target'),
-                'strategy': campaign.get('strategy'), 'channel': campaign.get('channel')
-            }
-            metrics = campaign.get('metrics', {})
-            for metric_name, metric_value in metrics.items():
-                campaign_info[f'metric_{metric_name}'] = metric_value
-            campaigns_list.append(campaign_info)
-        df = pd.DataFrame(campaigns_list)
+        builder = ColumnarBuilder(CAMPAIGN_FIELDS)
+        builder.extend(campaigns_data)
+        df = builder.to_dataframe()
         logger.info(f"DataFrame de campanhas criado com {len(df)} linhas")
         return df
 
-def run_collector(access_token, advertiser_id):
-    """Executa o coletor de dados de campanhas para um anunciante específico."""
-    collector = MercadoLivreAdsCollector(access_token)
+    def _get_ads_page(self, advertiser_id, date_from, date_to, metrics=None, limit=50, offset=0):
+        """Busca uma página de anúncios (itens) do anunciante com suas métricas."""
+        try:
+            headers = {"Api-Version": "2"}
+            url = f"{self.base_url}/advertising/advertisers/{advertiser_id}/product_ads/ads/search"
+            params = {"limit": limit, "offset": offset, "date_from": date_from, "date_to": date_to}
+            if metrics: params["metrics"] = ",".join(metrics)
+            response = self.session.get(url, headers=headers, params=params)
+            response.raise_for_status()
+            return _parse_json(response)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro ao obter anúncios do anunciante {advertiser_id} (offset {offset}): {e}")
+            return None
+
+    def get_items_metrics(self, advertiser_id, date_from, date_to, metrics=None):
+        """Obtém as métricas por item de todos os anúncios das campanhas do anunciante.
+
+        As páginas são buscadas em paralelo e gravadas direto em colunas; cada
+        par (campanha, item) aparece uma única vez, então um item anunciado em
+        mais de uma campanha tem uma linha por campanha.
+        """
+        builder = ColumnarBuilder(ITEM_FIELDS)
+        seen = set()
+        limit = 50
+
+        def fetch_page(offset):
+            logger.info(f"Coletando página de anúncios {offset // limit + 1}...")
+            return self._get_ads_page(advertiser_id, date_from, date_to, metrics, limit, offset)
+
+        for data in self._fan_out_pages(fetch_page, limit):
+            for ad in data['results']:
+                key = (ad.get('campaign_id'), ad.get('item_id'))
+                if key in seen:
+                    continue
+                seen.add(key)
+                builder.append(ad)
+        logger.info(f"Total de anúncios coletados: {builder.n_rows}")
+        return builder.to_dataframe()
+
+# Coletores mantidos por token: no máximo MAX_COLLECTORS, descartados após COLLECTOR_IDLE_SECONDS sem uso
+MAX_COLLECTORS = int(os.environ.get("MELI_MAX_COLLECTORS", "16"))
+COLLECTOR_IDLE_SECONDS = float(os.environ.get("MELI_COLLECTOR_IDLE_SECONDS", "1800"))
+_collectors = OrderedDict()
+_collectors_lock = threading.Lock()
+
+def get_collector(access_token):
+    """Retorna o coletor do token, reaproveitado enquanto estiver em uso (mantém as conexões).
+
+    Tokens expirados ou trocados não ficam presos ao processo: os coletores ociosos
+    e os menos usados além de MAX_COLLECTORS são fechados.
+    """
+    key = token_namespace(access_token)
+    now = time.monotonic()
+    evicted = []
+    with _collectors_lock:
+        entry = _collectors.pop(key, None)
+        collector = entry[0] if entry else MercadoLivreAdsCollector(access_token)
+        _collectors[key] = (collector, now)
+        for other_key, (other, last_used) in list(_collectors.items()):
+            if len(_collectors) > MAX_COLLECTORS or now - last_used > COLLECTOR_IDLE_SECONDS:
+                del _collectors[other_key]
+                evicted.append(other)
+    for other in evicted:
+        other.close()
+    return collector
+
+class AsyncMercadoLivreAdsCollector:
+    """Variante assíncrona do coletor.
+
+    As chamadas rodam em threads sobre o coletor síncrono, de modo que cache,
+    armazenamento de pedidos e limitador de taxa continuam compartilhados.
+    """
+
+    def __init__(self, collector):
+        self.collector = collector
+
+    async def get_user_id(self):
+        return await asyncio.to_thread(self.collector.get_user_id)
+
+    async def get_advertisers(self, product_id="PADS"):
+        return await asyncio.to_thread(self.collector.get_advertisers, product_id)
+
+    async def get_orders_metrics(self, seller_id, date_from, date_to):
+        return await asyncio.to_thread(self.collector.get_orders_metrics, seller_id, date_from, date_to)
+
+    async def get_orders_daily(self, seller_id, date_from, date_to):
+        return await asyncio.to_thread(self.collector.get_orders_daily, seller_id, date_from, date_to)
+
+    async def get_ads_summary_metrics(self, advertiser_id, date_from, date_to):
+        return await asyncio.to_thread(self.collector.get_ads_summary_metrics, advertiser_id, date_from, date_to)
+
+    async def get_campaigns_daily(self, advertiser_id, date_from, date_to, **kwargs):
+        return await asyncio.to_thread(
+            self.collector.get_campaigns_daily, advertiser_id, date_from, date_to, **kwargs
+        )
+
+    async def get_all_campaigns_paginated(self, advertiser_id, date_from, date_to, **kwargs):
+        return await asyncio.to_thread(
+            self.collector.get_all_campaigns_paginated, advertiser_id, date_from, date_to, **kwargs
+        )
+
+def run_sync(coro):
+    """Executa uma corrotina a partir de código síncrono (ex.: scripts do Streamlit)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+ADS_METRICS = [
+    "clicks", "prints", "ctr", "cost", "cpc", "acos",
+    "organic_units_quantity", "direct_items_quantity",
+    "indirect_items_quantity", "units_quantity",
+    "direct_amount", "indirect_amount", "total_amount"
+]
+
+def _last_30_days():
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
-    date_from = start_date.strftime('%Y-%m-%d')
-    date_to = end_date.strftime('%Y-%m-%d')
-    metrics = [
-        "clicks", "prints", "ctr", "cost", "cpc", "acos",
-        "organic_units_quantity", "direct_items_quantity",
-        "indirect_items_quantity", "units_quantity",
-        "direct_amount", "indirect_amount", "total_amount"
-    ]
-    campaigns = collector.get_all_campaigns_paginated(
-        advertiser_id, date_from, date_to, metrics=metrics, max_pages=5
-    )
-    if not campaigns: return pd.DataFrame()
-    return collector.campaigns_to_dataframe(campaigns)
\ No newline at end of file
+    return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+
+def run_collector(access_token, advertiser_id, progress=None):
+    """Executa o coletor de dados de campanhas para um anunciante específico."""
+    collector = get_collector(access_token)
+    date_from, date_to = _last_30_days()
+    return collector.get_campaigns_dataframe(advertiser_id, date_from, date_to, metrics=ADS_METRICS, progress=progress)
+
+def run_items_collector(access_token, advertiser_id):
+    """Coleta as métricas por item (anúncio) dos últimos 30 dias para um anunciante."""
+    collector = get_collector(access_token)
+    date_from, date_to = _last_30_days()
+    return collector.get_items_metrics(advertiser_id, date_from, date_to, metrics=ADS_METRICS)
+
+def run_attribution_collector(access_token, advertiser_id):
+    """Coleta os pedidos (OrderColumns) e as métricas por item dos últimos 30 dias, para a atribuição de vendas."""
+    collector = get_collector(access_token)
+    seller_id = collector.get_user_id()
+    if not seller_id:
+        raise CollectionError("Não foi possível obter o ID do vendedor")
+    date_from, date_to = _last_30_days()
+    orders = collector.get_orders_columns(seller_id, date_from, date_to)
+    return orders, collector.get_items_metrics(advertiser_id, date_from, date_to, metrics=ADS_METRICS)
@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from response_cache_module import DEFAULT_CACHE_DIR
+
+# Métricas aditivas armazenadas por campanha e dia; as razões (CTR, CPC, ACOS, ROAS)
+# são derivadas na consulta, já que somar razões distorce os totais
+SNAPSHOT_METRICS = (
+    "clicks", "prints", "cost", "organic_units_quantity", "direct_items_quantity",
+    "indirect_items_quantity", "units_quantity", "direct_amount", "indirect_amount", "total_amount",
+)
+DERIVED_METRICS = ("ctr", "cpc", "acos", "roas")
+
+def _ratio(numerator, denominator, scale=1.0):
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    out = np.full(numerator.shape, np.nan)
+    np.divide(numerator * scale, denominator, out=out, where=denominator > 0)
+    return out
+
+def add_derived_metrics(df):
+    """Acrescenta CTR (%), CPC, ACOS (%) e ROAS calculados a partir das métricas aditivas."""
+    return df.assign(
+        ctr=_ratio(df["clicks"], df["prints"], 100),
+        cpc=_ratio(df["cost"], df["clicks"]),
+        acos=_ratio(df["cost"], df["total_amount"], 100),
+        roas=_ratio(df["total_amount"], df["cost"]),
+    )
+
+class MetricsWarehouse:
+    """Histórico local de métricas diárias por campanha (SQLite), indexado por anunciante/campanha/dia.
+
+    Cada dia coletado é registrado em `warehouse_days`; apenas dias encerrados
+    (`closed = 1`) contam como cobertos e não voltam a ser buscados na API.
+    Com `path=":memory:"`, o histórico vive só enquanto o objeto existir.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "warehouse.sqlite3")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        metric_columns = ", ".join(f"{m} REAL" for m in SNAPSHOT_METRICS)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS campaign_daily (
+                    advertiser_id TEXT NOT NULL,
+                    campaign_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    {metric_columns},
+                    PRIMARY KEY (advertiser_id, campaign_id, day)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_campaign_daily_day ON campaign_daily (advertiser_id, day)")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS campaigns (
+                    advertiser_id TEXT NOT NULL,
+                    campaign_id TEXT NOT NULL,
+                    name TEXT,
+                    status TEXT,
+                    budget REAL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (advertiser_id, campaign_id)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS warehouse_days (
+                    advertiser_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    closed INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (advertiser_id, day)
+                )"""
+            )
+
+    def save_day(self, advertiser_id, day, campaigns_df, closed):
+        """Grava as métricas de um dia a partir do DataFrame de campanhas (colunas `metric_*`)."""
+        advertiser_id, day, now = str(advertiser_id), str(day), time.time()
+        daily_rows, campaign_rows = [], []
+        if not campaigns_df.empty:
+            metrics = pd.DataFrame({
+                m: pd.to_numeric(campaigns_df[f"metric_{m}"], errors="coerce") if f"metric_{m}" in campaigns_df
+                else np.nan
+                for m in SNAPSHOT_METRICS
+            }, index=campaigns_df.index).astype(object)
+            metrics = metrics.where(metrics.notna(), None)
+            campaign_ids = campaigns_df["campaign_id"].astype(str).tolist()
+            daily_rows = [
+                (advertiser_id, campaign_id, day, *values)
+                for campaign_id, values in zip(campaign_ids, metrics.itertuples(index=False, name=None))
+            ]
+            campaign_rows = [
+                (advertiser_id, campaign_id, name, None if pd.isna(status) else str(status),
+                 None if pd.isna(budget) else float(budget), now)
+                for campaign_id, name, status, budget in zip(
+                    campaign_ids, campaigns_df["name"], campaigns_df["status"], campaigns_df["budget"]
+                )
+            ]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM campaign_daily WHERE advertiser_id = ? AND day = ?", (advertiser_id, day)
+            )
+            self._conn.executemany(
+                f"INSERT INTO campaign_daily VALUES ({', '.join('?' * (len(SNAPSHOT_METRICS) + 3))})", daily_rows
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO campaigns VALUES (?, ?, ?, ?, ?, ?)", campaign_rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO warehouse_days VALUES (?, ?, ?, ?)", (advertiser_id, day, int(closed), now)
+            )
+
+    def covered_days(self, advertiser_id, date_from, date_to):
+        """Dias encerrados já armazenados no intervalo."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day FROM warehouse_days WHERE advertiser_id = ? AND day BETWEEN ? AND ? AND closed = 1",
+                (str(advertiser_id), str(date_from), str(date_to)),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def load_daily(self, advertiser_id, date_from, date_to, campaign_ids=None):
+        """Métricas por (campanha, dia) do intervalo, com nome da campanha e métricas derivadas."""
+        query = (
+            f"SELECT d.campaign_id, c.name, d.day, {', '.join(f'd.{m}' for m in SNAPSHOT_METRICS)} "
+            "FROM campaign_daily d LEFT JOIN campaigns c "
+            "ON c.advertiser_id = d.advertiser_id AND c.campaign_id = d.campaign_id "
+            "WHERE d.advertiser_id = ? AND d.day BETWEEN ? AND ?"
+        )
+        params = [str(advertiser_id), str(date_from), str(date_to)]
+        if campaign_ids is not None:
+            campaign_ids = [str(c) for c in campaign_ids]
+            query += f" AND d.campaign_id IN ({', '.join('?' * len(campaign_ids))})"
+            params += campaign_ids
+        with self._lock:
+            df = pd.read_sql_query(query + " ORDER BY d.day, d.campaign_id", self._conn, params=params)
+        df["day"] = pd.to_datetime(df["day"])
+        return add_derived_metrics(df)
+
+    def trend(self, advertiser_id, date_from, date_to, metric="acos", by_campaign=True):
+        """Série diária de uma métrica (aditiva ou derivada) no intervalo.
+
+        Com `by_campaign=True` retorna um DataFrame dia × campanha; caso contrário,
+        uma Series com o total do anunciante por dia.
+        """
+        if metric not in SNAPSHOT_METRICS and metric not in DERIVED_METRICS:
+            raise ValueError(f"Métrica desconhecida: {metric}")
+        group = "day, campaign_id" if by_campaign else "day"
+        with self._lock:
+            df = pd.read_sql_query(
+                f"SELECT {group}, {', '.join(f'SUM({m}) AS {m}' for m in SNAPSHOT_METRICS)} "
+                f"FROM campaign_daily WHERE advertiser_id = ? AND day BETWEEN ? AND ? GROUP BY {group} ORDER BY day",
+                self._conn, params=(str(advertiser_id), str(date_from), str(date_to)),
+            )
+        df["day"] = pd.to_datetime(df["day"])
+        df = add_derived_metrics(df)
+        if by_campaign:
+            return df.pivot(index="day", columns="campaign_id", values=metric)
+        return df.set_index("day")[metric]
+
+    def clear(self, advertiser_id=None):
+        """Remove o histórico (todo ou de um anunciante)."""
+        with self._lock, self._conn:
+            for table in ("campaign_daily", "campaigns", "warehouse_days"):
+                if advertiser_id is None:
+                    self._conn.execute(f"DELETE FROM {table}")
+                else:
+                    self._conn.execute(f"DELETE FROM {table} WHERE advertiser_id = ?", (str(advertiser_id),))
+
+_default_warehouse = None
+_default_warehouse_lock = threading.Lock()
+
+def get_default_warehouse():
+    """MetricsWarehouse compartilhado pelo processo, criado sob demanda."""
+    global _default_warehouse
+    with _default_warehouse_lock:
+        if _default_warehouse is None:
+            _default_warehouse = MetricsWarehouse()
+        return _default_warehouse
@@ -0,0 +1,236 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from order_store_module import DAY_FIELDS
+from response_cache_module import MELI_TZ
+
+VALID_ORDER_STATUSES = ('paid', 'shipped', 'delivered')
+CANCELLED_ORDER_STATUS = 'cancelled'
+
+_NS_PER_DAY = 86_400 * 10**9
+_TZ_OFFSET_NS = int(MELI_TZ.utcoffset(None).total_seconds()) * 10**9
+_NAT = np.iinfo(np.int64).min
+# Datas ainda em texto são convertidas em lotes deste tamanho
+DATE_BATCH = 10_000
+
+class OrderColumnsBuilder:
+    """Acumula os pedidos de `/orders/search` em colunas compactas, página a página.
+
+    Cada pedido vira uma linha de arrays tipados (id, data, código de status,
+    valor, unidades); os itens ficam em layout CSR (`item_offsets` aponta o
+    trecho de cada pedido em `item_codes`/`item_quantity`/`item_unit_price`).
+    Os dicionários da API não são guardados.
+    """
+
+    def __init__(self):
+        self.order_id = array("q")
+        self.created = array("q")
+        self.status = array("h")
+        self.total_amount = array("d")
+        self.units = array("i")
+        self.item_offsets = array("q", [0])
+        self.item_codes = array("i")
+        self.item_quantity = array("i")
+        self.item_unit_price = array("d")
+        self.statuses = {}
+        self.items = {}
+        self._pending_dates = []
+
+    def _code(self, mapping, value):
+        code = mapping.get(value)
+        if code is None:
+            code = mapping[value] = len(mapping)
+        return code
+
+    def add_orders(self, orders):
+        """Incorpora uma página de pedidos (`results` de `/orders/search`)."""
+        for order in orders:
+            self.order_id.append(int(order.get('id') or 0))
+            self.status.append(self._code(self.statuses, order.get('status') or 'unknown'))
+            amount = order.get('total_amount')
+            self.total_amount.append(float(amount) if amount is not None else np.nan)
+            self._pending_dates.append(order.get('date_created'))
+            units = 0
+            for item in order.get('order_items', []):
+                quantity = int(item.get('quantity') or 0)
+                price = item.get('unit_price')
+                self.item_codes.append(self._code(self.items, (item.get('item') or {}).get('id')))
+                self.item_quantity.append(quantity)
+                self.item_unit_price.append(float(price) if price is not None else np.nan)
+                units += quantity
+            self.units.append(units)
+            self.item_offsets.append(len(self.item_codes))
+        if len(self._pending_dates) >= DATE_BATCH:
+            self._flush_dates()
+
+    def _flush_dates(self):
+        """Converte as datas pendentes de uma vez; inválidas viram NaT."""
+        if not self._pending_dates:
+            return
+        created = pd.to_datetime(
+            pd.Series(self._pending_dates, dtype=object), utc=True, errors="coerce", format="ISO8601"
+        )
+        self.created.extend(created.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64).tolist())
+        self._pending_dates = []
+
+    def __len__(self):
+        return len(self.order_id)
+
+    def build(self):
+        """Congela os buffers em um OrderColumns."""
+        self._flush_dates()
+        return OrderColumns(
+            order_id=np.array(self.order_id, dtype=np.int64),
+            created=np.array(self.created, dtype=np.int64),
+            status=np.array(self.status, dtype=np.int16),
+            status_names=list(self.statuses),
+            total_amount=np.array(self.total_amount, dtype=np.float64),
+            units=np.array(self.units, dtype=np.int32),
+            item_offsets=np.array(self.item_offsets, dtype=np.int64),
+            item_codes=np.array(self.item_codes, dtype=np.int32),
+            item_quantity=np.array(self.item_quantity, dtype=np.int32),
+            item_unit_price=np.array(self.item_unit_price, dtype=np.float64),
+            item_ids=list(self.items),
+        )
+
+class OrderColumns:
+    """Pedidos em struct-of-arrays, com agregações vetorizadas por dia, status e item.
+
+    Os totais seguem as regras do OrdersMetricsAccumulator: vendas, faturamento e
+    unidades contam só pedidos válidos (pagos, enviados ou entregues); pedidos
+    cancelados entram nos campos de cancelamento.
+    """
+
+    def __init__(self, order_id, created, status, status_names, total_amount, units,
+                 item_offsets, item_codes, item_quantity, item_unit_price, item_ids):
+        self.order_id = order_id
+        self.created = created
+        self.status = status
+        self.status_names = status_names
+        self.total_amount = total_amount
+        self.units = units
+        self.item_offsets = item_offsets
+        self.item_codes = item_codes
+        self.item_quantity = item_quantity
+        self.item_unit_price = item_unit_price
+        self.item_ids = item_ids
+
+    def __len__(self):
+        return len(self.order_id)
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays (sem contar os vocabulários de status e itens)."""
+        return sum(a.nbytes for a in (
+            self.order_id, self.created, self.status, self.total_amount, self.units,
+            self.item_offsets, self.item_codes, self.item_quantity, self.item_unit_price,
+        ))
+
+    def _status_mask(self, names):
+        codes = [i for i, name in enumerate(self.status_names) if name in names]
+        return np.isin(self.status, codes)
+
+    @property
+    def valid(self):
+        return self._status_mask(VALID_ORDER_STATUSES)
+
+    @property
+    def cancelled(self):
+        return self._status_mask((CANCELLED_ORDER_STATUS,))
+
+    @property
+    def days(self):
+        """Dia de criação de cada pedido no fuso da API (datetime64[D]; NaT se a data for inválida)."""
+        days = np.where(self.created == _NAT, _NAT, (self.created + _TZ_OFFSET_NS) // _NS_PER_DAY)
+        return days.view("datetime64[D]")
+
+    @property
+    def line_order(self):
+        """Índice do pedido de cada linha de item."""
+        return np.repeat(np.arange(len(self)), np.diff(self.item_offsets))
+
+    def line_amount(self):
+        """Valor de cada linha de item: preço unitário x quantidade ou, sem preço, a parte
+        do `total_amount` do pedido proporcional às unidades."""
+        order = self.line_order
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = self.total_amount[order] * self.item_quantity / self.units[order]
+        amount = np.where(np.isnan(self.item_unit_price), share, self.item_unit_price * self.item_quantity)
+        return np.nan_to_num(amount)
+
+    def _day_totals_frame(self):
+        amount = np.nan_to_num(self.total_amount)
+        valid, cancelled = self.valid, self.cancelled
+        frame = pd.DataFrame({
+            "dia": self.days.astype("datetime64[ns]"),
+            "pedidos_processados": 1,
+            "vendas_brutas": np.where(valid, amount, 0.0),
+            "unidades_vendidas": np.where(valid, self.units, 0),
+            "total_de_vendas": valid.astype(np.int64),
+            "qtd_vendas_canceladas": cancelled.astype(np.int64),
+            "valor_vendas_canceladas": np.where(cancelled, amount, 0.0),
+        })
+        return frame.dropna(subset=["dia"]).groupby("dia")[list(DAY_FIELDS)].sum()
+
+    def day_totals(self, date_from, date_to):
+        """Totais por dia ({dia: {campo: valor}}) de todos os dias do intervalo, no formato do OrderStore."""
+        days = pd.date_range(str(date_from)[:10], str(date_to)[:10], freq="D")
+        totals = self._day_totals_frame().reindex(days, fill_value=0)
+        return {
+            day.date().isoformat(): {field: row[field] for field in DAY_FIELDS}
+            for day, row in zip(days, totals.to_dict("records"))
+        }
+
+    def by_day(self):
+        """Métricas de negócio por dia, no formato de `get_orders_daily`."""
+        totals = self._day_totals_frame()
+        df = totals.reset_index()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df["ticket_medio"] = np.where(df["total_de_vendas"] > 0, df["vendas_brutas"] / df["total_de_vendas"], 0)
+            df["preco_medio_por_unidade"] = np.where(
+                df["unidades_vendidas"] > 0, df["vendas_brutas"] / df["unidades_vendidas"], 0
+            )
+        df["dia"] = pd.to_datetime(df["dia"])
+        return df.drop(columns="pedidos_processados")
+
+    def by_status(self):
+        """Quantidade de pedidos, valor e unidades por status."""
+        n_status = len(self.status_names)
+        counts = np.bincount(self.status, minlength=n_status)
+        amounts = np.bincount(self.status, weights=np.nan_to_num(self.total_amount), minlength=n_status)
+        units = np.bincount(self.status, weights=self.units, minlength=n_status)
+        df = pd.DataFrame({
+            "status": self.status_names, "pedidos": counts, "valor": amounts, "unidades": units.astype(np.int64),
+        })
+        df["participacao_pct"] = df["pedidos"] / max(len(self), 1) * 100
+        return df.sort_values("pedidos", ascending=False, ignore_index=True)
+
+    def by_item(self, valid_only=True):
+        """Pedidos, unidades e faturamento por item (só pedidos válidos, por padrão)."""
+        order = self.line_order
+        mask = self.valid[order] if valid_only else np.ones(len(order), dtype=bool)
+        codes = self.item_codes[mask]
+        n_items = len(self.item_ids)
+        # Um pedido com o mesmo item em duas linhas conta uma vez
+        order_item = np.unique(np.stack([order[mask], codes]), axis=1)
+        df = pd.DataFrame({
+            "item_id": self.item_ids,
+            "pedidos": np.bincount(order_item[1], minlength=n_items),
+            "unidades": np.bincount(codes, weights=self.item_quantity[mask], minlength=n_items).astype(np.int64),
+            "faturamento": np.bincount(codes, weights=self.line_amount()[mask], minlength=n_items),
+        })
+        df = df[(df["pedidos"] > 0) & df["item_id"].notna()]
+        return df.sort_values("faturamento", ascending=False, ignore_index=True)
+
+    def to_frame(self):
+        """Um pedido por linha (sem os itens)."""
+        return pd.DataFrame({
+            "order_id": self.order_id,
+            "date_created": pd.to_datetime(self.created, utc=True).tz_convert(MELI_TZ),
+            "status": pd.Categorical.from_codes(self.status, categories=self.status_names),
+            "total_amount": self.total_amount,
+            "unidades": self.units,
+            "itens": np.diff(self.item_offsets),
+        })
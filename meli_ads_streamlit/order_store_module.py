@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import threading
+import time
+
+from response_cache_module import DEFAULT_CACHE_DIR
+
+# Totais diários persistidos (mesmos campos do OrdersMetricsAccumulator)
+DAY_FIELDS = (
+    "pedidos_processados", "vendas_brutas", "unidades_vendidas", "total_de_vendas",
+    "qtd_vendas_canceladas", "valor_vendas_canceladas",
+)
+
+
+class OrderStore:
+    """Armazena os totais de pedidos particionados por dia e por vendedor (SQLite).
+
+    Apenas dias encerrados (`closed = 1`) contam como cobertos; o dia corrente é
+    gravado para consulta, mas sempre buscado novamente.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "orders.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS order_days (
+                    seller_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    pedidos_processados INTEGER NOT NULL,
+                    vendas_brutas REAL NOT NULL,
+                    unidades_vendidas INTEGER NOT NULL,
+                    total_de_vendas INTEGER NOT NULL,
+                    qtd_vendas_canceladas INTEGER NOT NULL,
+                    valor_vendas_canceladas REAL NOT NULL,
+                    closed INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (seller_id, day)
+                )"""
+            )
+
+    def load_closed_days(self, seller_id, date_from, date_to):
+        """Retorna {dia: {campo: valor}} dos dias encerrados já armazenados no intervalo."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT day, {', '.join(DAY_FIELDS)} FROM order_days "
+                "WHERE seller_id = ? AND day BETWEEN ? AND ? AND closed = 1",
+                (str(seller_id), str(date_from), str(date_to)),
+            ).fetchall()
+        return {row[0]: dict(zip(DAY_FIELDS, row[1:])) for row in rows}
+
+    def save_days(self, seller_id, days, closed_before):
+        """Grava os totais de `days` ({dia: {campo: valor}}); dias anteriores a `closed_before` ficam encerrados."""
+        now = time.time()
+        rows = [
+            (str(seller_id), day, *(totals[f] for f in DAY_FIELDS), int(day < str(closed_before)), now)
+            for day, totals in days.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO order_days VALUES ({', '.join('?' * (len(DAY_FIELDS) + 4))})", rows
+            )
+
+    def clear(self, seller_id=None):
+        """Remove os dias armazenados (todos ou de um vendedor)."""
+        with self._lock, self._conn:
+            if seller_id is None:
+                self._conn.execute("DELETE FROM order_days")
+            else:
+                self._conn.execute("DELETE FROM order_days WHERE seller_id = ?", (str(seller_id),))
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_order_store():
+    """OrderStore compartilhado pelo processo, criado sob demanda."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = OrderStore()
+        return _default_store
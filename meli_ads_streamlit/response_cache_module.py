@@ -0,0 +1,216 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import requests
+
+from http_throttle_module import ThrottledSession
+from instrumentation_module import endpoint_label, get_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MELI_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("MELI_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+# Fuso usado pela API nas janelas de data (mesmo offset de get_orders_metrics)
+MELI_TZ = timezone(timedelta(hours=-3))
+
+# TTL (segundos) por endpoint, avaliado na ordem; o primeiro padrão que casar vence
+ENDPOINT_TTLS = [
+    (re.compile(r"^/users/me$"), 24 * 3600),
+    (re.compile(r"^/advertising/advertisers$"), 3600),
+    (re.compile(r"^/advertising/advertisers/[^/]+/product_ads/campaigns"), 15 * 60),
+    (re.compile(r"^/orders/search$"), 10 * 60),
+]
+DEFAULT_TTL = 5 * 60
+
+# Parâmetros que indicam o fim da janela de datas consultada
+DATE_TO_PARAMS = ("date_to", "order.date_created.to")
+
+
+def token_namespace(access_token):
+    """Identificador estável (e não reversível) de um token, usado para isolar clientes."""
+    return hashlib.sha256((access_token or "").encode("utf-8")).hexdigest()[:16]
+
+
+def today_meli():
+    """Data atual no fuso da API."""
+    return datetime.now(MELI_TZ).date()
+
+
+def is_closed_window(params):
+    """Indica se a janela consultada termina em um dia já encerrado (antes de hoje)."""
+    for name in DATE_TO_PARAMS:
+        value = (params or {}).get(name)
+        if value:
+            try:
+                return datetime.strptime(str(value)[:10], "%Y-%m-%d").date() < today_meli()
+            except ValueError:
+                return False
+    return False
+
+
+def ttl_for(path, params):
+    """TTL em segundos para uma requisição; None significa que nunca expira."""
+    if is_closed_window(params):
+        return None
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(path):
+            return ttl
+    return DEFAULT_TTL
+
+
+class ResponseCache:
+    """Cache de respostas em SQLite, com TTL por endpoint e despejo LRU limitado por tamanho."""
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "responses.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses (last_access)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_ns ON responses (namespace)")
+
+    @staticmethod
+    def make_key(namespace, method, url, params=None, api_version=None):
+        """Chave determinística a partir de endpoint, parâmetros e versão da API."""
+        payload = json.dumps(
+            [namespace, method.upper(), url, sorted((str(k), str(v)) for k, v in (params or {}).items()), api_version],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Retorna o corpo armazenado ou None se ausente/expirado."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            body, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return body
+
+    def set(self, key, namespace, endpoint, body, ttl):
+        """Armazena um corpo de resposta; `ttl=None` mantém a entrada até ser despejada."""
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, endpoint, body, len(body), expires_at, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self, namespace=None, keep_permanent=False):
+        """Remove todas as entradas (ou apenas as de um token).
+
+        Com `keep_permanent=True`, preserva as entradas sem expiração (dias encerrados).
+        """
+        conditions, params = [], []
+        if namespace is not None:
+            conditions.append("namespace = ?")
+            params.append(namespace)
+        if keep_permanent:
+            conditions.append("expires_at IS NOT NULL")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM responses{where}", params)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Cache compartilhado pelo processo, criado sob demanda."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+class CachedSession(ThrottledSession):
+    """Sessão HTTP que atende GETs a partir do ResponseCache quando possível.
+
+    Apenas as requisições que não estão no cache passam pelo limitador de taxa.
+    """
+
+    def __init__(self, cache=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        if self.cache is None or method.upper() != "GET":
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        merged_headers = dict(self.headers)
+        merged_headers.update(headers or {})
+        namespace = token_namespace((merged_headers.get("Authorization") or "").removeprefix("Bearer "))
+        path = urlsplit(url).path
+        key = ResponseCache.make_key(namespace, method, url, params, merged_headers.get("Api-Version"))
+
+        body = self.cache.get(key)
+        get_registry().inc("meli_cache_requests_total", endpoint=endpoint_label(path),
+                           result="hit" if body is not None else "miss")
+        if body is not None:
+            response = requests.Response()
+            response.status_code = 200
+            response._content = body
+            response.encoding = "utf-8"
+            response.headers["Content-Type"] = "application/json"
+            response.url = url
+            return response
+
+        response = super().request(method, url, params=params, headers=headers, **kwargs)
+        if response.status_code == 200:
+            self.cache.set(key, namespace, path, response.content, ttl_for(path, params))
+        return response
@@ -1,6 +1,12 @@
 
+import numpy as np
 import pandas as pd
 import os
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+from instrumentation_module import timed_stage
 
 # Dados da tabela_extraida.xlsx hardcoded
 # Dados da tabela_extraida.xlsx corrigidos
@@ -19,125 +25,222 @@ hardcoded_strategy_model_data = [
     {"Nome": "Acos Elevado", "Orçamento": 50, "ACOS Objetivo": 6, "ACOS": 6, "Tipo de Impressão": "Baixa Impressão", "% de impressões ganhas": 50, "% de impressões perdidas por orçamento": 0, "% de impressões perdidas por classificação": 50, "Cliques": 1000, "(Investimento / Receitas)": "10 acima", "Unidades vendidas por publicidade": 20, "Quantidade": 500},
     {"Nome": "Recorrencia de vendas", "Orçamento": 15, "ACOS Objetivo": 5, "ACOS": 5, "Tipo de Impressão": "Impressões elevadas", "% de impressões ganhas": 65, "% de impressões perdidas por orçamento": 0, "% de impressões perdidas por classificação": 35, "Cliques": 1000, "(Investimento / Receitas)": "10 á abaixo", "Unidades vendidas por publicidade": 10, "Quantidade": 1000}
 ]
-def find_best_strategy(campaign, strategy_model):
-    best_match_strategy = "Nenhuma estratégia recomendada"
-    min_diff = float("inf")
-
-    impression_mapping = {
-        "Baixa Impressão": ["Baixa Impressão"],
-        "Media Impressão": ["Media Impressão"],
-        "Impressões elevadas": ["Impressões elevadas"]
-    }
-
-    for index, strategy in strategy_model.iterrows():
-        acos_diff = abs(campaign["metric_acos"] - strategy["Estrategia_ACOS"])
-
-        campaign_impression_type = str(campaign.get("Tipo de Impressão", "")).strip()
-        strategy_impression_type = str(strategy.get("Estrategia_Tipo_Impressao", "")).strip()
-
-        impression_match = False
-        for key, values in impression_mapping.items():
-            if strategy_impression_type == key and campaign_impression_type in values:
-                impression_match = True
-                break
-
-        clicks_match = False
-        if pd.notna(campaign["metric_clicks"]) and pd.notna(strategy["Estrategia_Cliques"]):
-            if strategy["Estrategia_Cliques"] == 0:
-                if campaign["metric_clicks"] < 5:
-                    clicks_match = True
-            elif abs(campaign["metric_clicks"] - strategy["Estrategia_Cliques"]) <= 10:
-                clicks_match = True
-        else:
-            clicks_match = False
-
-        current_diff = acos_diff
-        if not impression_match:
-            current_diff += 100
-        if not clicks_match:
-            current_diff += 50
-
-        if current_diff < min_diff:
-            min_diff = current_diff
-            best_match_strategy = strategy["Estrategia_Nome"]
-
-    return best_match_strategy
-
-def analyze_and_recommend(campaigns_df):
-    strategy_model_df = pd.DataFrame(hardcoded_strategy_model_data)
-
-    strategy_model_df = strategy_model_df.rename(columns={
-        "Nome": "Estrategia_Nome",
-        "Orçamento": "Estrategia_Orcamento",
-        "ACOS Objetivo": "Estrategia_ACOS_Objetivo",
-        "ACOS": "Estrategia_ACOS",
-        "Tipo de Impressão": "Estrategia_Tipo_Impressao",
-        "% de impressões ganhas": "Estrategia_Impressoes_Ganhas",
-        "% de impressões perdidas por orçamento": "Estrategia_Impressoes_Perdidas_Orcamento",
-        "% de impressões perdidas por classificação": "Estrategia_Impressoes_Perdidas_Classificacao",
-        "Cliques": "Estrategia_Cliques",
-        "(Investimento / Receitas)": "Estrategia_Investimento_Receitas",
-        "Unidades vendidas por publicidade": "Estrategia_Unidades_Vendidas",
-        "Quantidade": "Estrategia_Quantidade"
-    })
-
-    campaigns_df["Estrategia_Recomendada"] = campaigns_df.apply(
-        lambda row: find_best_strategy(row, strategy_model_df), axis=1
+NO_STRATEGY = "Nenhuma estratégia recomendada"
+
+# Tipos de impressão reconhecidos; campanha e estratégia casam quando têm o mesmo tipo
+IMPRESSION_TYPES = ["Baixa Impressão", "Media Impressão", "Impressões elevadas"]
+
+# Penalidades somadas à diferença de ACOS quando o critério não é atendido
+IMPRESSION_MISMATCH_PENALTY = 100
+CLICKS_MISMATCH_PENALTY = 50
+# Só aplicada quando as campanhas trazem `metric_tacos` (ver attribution_module)
+TACOS_MISMATCH_PENALTY = 25
+
+# Faixa de "(Investimento / Receitas)" no modelo, ex.: "10 á abaixo", "10 acima"
+_INVESTMENT_RANGE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(?:[áa]\s*)?(abaixo|acima)", re.IGNORECASE)
+
+# Planilha opcional com o modelo de estratégias (ex.: tabela_extraida.xlsx); sem ela, usa os dados acima
+STRATEGY_MODEL_PATH = os.environ.get("MELI_STRATEGY_MODEL_PATH")
+
+def _impression_codes(values):
+    """Códigos inteiros dos tipos de impressão (-1 para tipos não reconhecidos)."""
+    stripped = pd.Series(values, dtype=object).map(lambda v: str(v).strip())
+    return pd.Categorical(stripped.where(stripped.isin(IMPRESSION_TYPES)), categories=IMPRESSION_TYPES).codes
+
+def _investment_ranges(values):
+    """Limite (%) e sentido (True = até o limite) de cada faixa de investimento/receitas; NaN se não reconhecida."""
+    limits, below = [], []
+    for value in values:
+        match = _INVESTMENT_RANGE.search(str(value))
+        limits.append(float(match.group(1).replace(",", ".")) if match else np.nan)
+        below.append(bool(match) and match.group(2).lower() == "abaixo")
+    return np.array(limits, dtype=float), np.array(below, dtype=bool)
+
+def _readonly(values):
+    values = np.asarray(values)
+    values.setflags(write=False)
+    return values
+
+class StrategyModel:
+    """Modelo de estratégias compilado e imutável.
+
+    Guarda um dicionário nome -> linha e um array NumPy por atributo; a
+    recomendação compara todas as campanhas com todas as estratégias de uma vez
+    (ver `strategy_penalty_matrix`).
+    """
+
+    def __init__(self, records):
+        records = [dict(record) for record in records]
+        self.columns = tuple(records[0].keys()) if records else ()
+        self._rows = tuple(MappingProxyType(record) for record in records)
+        self._index_by_name = MappingProxyType({record["Nome"]: i for i, record in enumerate(records)})
+        arrays = {}
+        for column in self.columns:
+            values = pd.Series([record.get(column) for record in records], dtype=object)
+            numeric = pd.to_numeric(values, errors="coerce")
+            arrays[column] = _readonly(
+                numeric.to_numpy(dtype=float) if numeric.notna().sum() == values.notna().sum()
+                else values.to_numpy(dtype=object)
+            )
+        self.arrays = MappingProxyType(arrays)
+        self.names = self.arrays["Nome"] if records else _readonly(np.empty(0, dtype=object))
+        self.acos = _readonly(pd.to_numeric(pd.Series(self.arrays.get("ACOS", [])), errors="coerce").to_numpy(dtype=float))
+        self.clicks = _readonly(pd.to_numeric(pd.Series(self.arrays.get("Cliques", [])), errors="coerce").to_numpy(dtype=float))
+        self.impression_codes = _readonly(_impression_codes(self.arrays.get("Tipo de Impressão", [])))
+        tacos_limit, tacos_below = _investment_ranges(self.arrays.get("(Investimento / Receitas)", [None] * len(records)))
+        self.tacos_limit, self.tacos_below = _readonly(tacos_limit), _readonly(tacos_below)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, name):
+        """Linha (somente leitura) da estratégia pelo nome, ou None."""
+        i = self._index_by_name.get(name)
+        return None if i is None else self._rows[i]
+
+    def values_for(self, names, column, default=np.nan):
+        """Valores numéricos de `column` para cada nome de estratégia; `default` para nomes desconhecidos."""
+        positions = pd.Series(names, dtype=object).map(self._index_by_name)
+        found = positions.notna().to_numpy()
+        values = np.full(len(positions), default, dtype=float)
+        values[found] = pd.to_numeric(
+            pd.Series(self.arrays[column][positions[found].astype(int).to_numpy()]), errors="coerce"
+        ).to_numpy(dtype=float)
+        return values
+
+    def to_dataframe(self):
+        return pd.DataFrame(list(self._rows), columns=list(self.columns))
+
+@lru_cache(maxsize=None)
+def _compiled_default_model():
+    return StrategyModel(hardcoded_strategy_model_data)
+
+@lru_cache(maxsize=8)
+def _compiled_model_from_excel(path, mtime_ns):
+    return StrategyModel(pd.read_excel(path).to_dict("records"))
+
+def load_strategy_model(path):
+    """Compila o modelo a partir de uma planilha; recarrega apenas se o arquivo mudar."""
+    path = os.path.abspath(path)
+    return _compiled_model_from_excel(path, os.stat(path).st_mtime_ns)
+
+def get_strategy_model(path=None):
+    """Modelo compilado do processo (da planilha indicada ou dos dados embutidos)."""
+    path = path or STRATEGY_MODEL_PATH
+    return load_strategy_model(path) if path else _compiled_default_model()
+
+def strategy_penalty_matrix(campaign_acos, campaign_impression, campaign_clicks,
+                            strategy_acos, strategy_impression, strategy_clicks,
+                            campaign_tacos=None, strategy_tacos_limit=None, strategy_tacos_below=None):
+    """Matriz campanhas × estratégias com a diferença de ACOS mais as penalidades de impressão e cliques.
+
+    Com `campaign_tacos`, campanhas cujo TACOS está fora da faixa de investimento/receitas
+    da estratégia também são penalizadas; TACOS ou faixa desconhecidos não penalizam.
+    """
+    campaign_clicks = campaign_clicks[:, None]
+    acos_diff = np.abs(campaign_acos[:, None] - strategy_acos[None, :])
+    impression_match = (campaign_impression[:, None] == strategy_impression[None, :]) & (strategy_impression >= 0)
+    clicks_known = ~np.isnan(campaign_clicks) & ~np.isnan(strategy_clicks)
+    clicks_match = clicks_known & np.where(
+        strategy_clicks == 0,
+        campaign_clicks < 5,
+        np.abs(campaign_clicks - strategy_clicks) <= 10,
     )
+    penalties = (acos_diff
+                 + IMPRESSION_MISMATCH_PENALTY * ~impression_match
+                 + CLICKS_MISMATCH_PENALTY * ~clicks_match)
+    if campaign_tacos is None:
+        return penalties
+    campaign_tacos = campaign_tacos[:, None]
+    tacos_known = ~np.isnan(campaign_tacos) & ~np.isnan(strategy_tacos_limit)
+    tacos_match = np.where(strategy_tacos_below, campaign_tacos <= strategy_tacos_limit, campaign_tacos > strategy_tacos_limit)
+    return penalties + TACOS_MISMATCH_PENALTY * (tacos_known & ~tacos_match)
+
+def recommend_strategies(campaigns_df, strategy_model=None):
+    """Retorna a estratégia de menor penalidade para cada campanha, em um único passo vetorizado."""
+    if strategy_model is None:
+        strategy_model = get_strategy_model()
+    if campaigns_df.empty or not len(strategy_model):
+        return np.full(len(campaigns_df), NO_STRATEGY, dtype=object)
+
+    if "Tipo de Impressão" in campaigns_df.columns:
+        campaign_impression = _impression_codes(campaigns_df["Tipo de Impressão"].to_numpy(dtype=object))
+    else:
+        campaign_impression = np.full(len(campaigns_df), -1, dtype=np.int8)
+
+    campaign_tacos = None
+    if "metric_tacos" in campaigns_df.columns:
+        campaign_tacos = pd.to_numeric(campaigns_df["metric_tacos"], errors="coerce").to_numpy(dtype=float)
+
+    penalties = strategy_penalty_matrix(
+        pd.to_numeric(campaigns_df["metric_acos"], errors="coerce").to_numpy(dtype=float),
+        campaign_impression,
+        pd.to_numeric(campaigns_df["metric_clicks"], errors="coerce").to_numpy(dtype=float),
+        strategy_model.acos,
+        strategy_model.impression_codes,
+        strategy_model.clicks,
+        campaign_tacos,
+        strategy_model.tacos_limit,
+        strategy_model.tacos_below,
+    )
+    # Diferenças não finitas nunca vencem, como na comparação `<` do laço original
+    penalties = np.where(np.isfinite(penalties), penalties, np.inf)
+    best = penalties.argmin(axis=1)
+    best_penalty = penalties[np.arange(len(best)), best]
+    return np.where(np.isfinite(best_penalty), strategy_model.names[best], NO_STRATEGY)
 
-    return campaigns_df
-
-def consolidate_data(campaigns_df):
-    strategy_model_original_df = pd.DataFrame(hardcoded_strategy_model_data)
+def find_best_strategy(campaign, strategy_model=None):
+    """Recomenda a estratégia para uma única campanha (linha ou dicionário)."""
+    return recommend_strategies(pd.DataFrame([campaign]), strategy_model)[0]
 
-    column_mapping = {
-        "name": "Nome",
-        "budget": "Orçamento",
-        "acos_target": "ACOS Objetivo",
-        "metric_acos": "ACOS",
-        "metric_clicks": "Cliques",
-        "metric_units_quantity": "Unidades vendidas por publicidade",
-    }
+@timed_stage("analyze_and_recommend")
+def analyze_and_recommend(campaigns_df, strategy_model=None):
+    campaigns_df["Estrategia_Recomendada"] = recommend_strategies(campaigns_df, strategy_model)
 
-    for campaign_col, model_col in column_mapping.items():
-        if model_col not in campaigns_df.columns:
-            campaigns_df[model_col] = campaigns_df[campaign_col]
-        else:
-            campaigns_df[model_col] = campaigns_df[campaign_col]
+    return campaigns_df
 
+# Colunas da campanha copiadas para as colunas equivalentes do modelo
+CONSOLIDATION_COLUMN_MAPPING = {
+    "name": "Nome",
+    "budget": "Orçamento",
+    "acos_target": "ACOS Objetivo",
+    "metric_acos": "ACOS",
+    "metric_clicks": "Cliques",
+    "metric_units_quantity": "Unidades vendidas por publicidade",
+}
+
+@timed_stage("consolidate_data")
+def consolidate_data(campaigns_df, strategy_model=None):
+    """Monta a tabela final no layout do modelo de estratégia, sem alterar o DataFrame recebido."""
+    if strategy_model is None:
+        strategy_model = get_strategy_model()
+    derived = {
+        model_col: campaigns_df[campaign_col]
+        for campaign_col, model_col in CONSOLIDATION_COLUMN_MAPPING.items()
+    }
     if "Tipo de Impressão" not in campaigns_df.columns:
-        campaigns_df["Tipo de Impressão"] = ""
-
+        derived["Tipo de Impressão"] = ""
     if "% de impressões ganhas" not in campaigns_df.columns:
-        campaigns_df["% de impressões ganhas"] = campaigns_df["metric_prints"]
-
-    campaigns_df["(Investimento / Receitas)"] = campaigns_df.apply(
-        lambda row: row["metric_total_amount"] / row["metric_cost"] if row["metric_cost"] != 0 else pd.NA,
-        axis=1
-    )
-
-    model_columns_order = strategy_model_original_df.columns.tolist()
-
-    for col in model_columns_order:
-        if col not in campaigns_df.columns:
-            campaigns_df[col] = pd.NA
-
-    campaign_original_cols_not_mapped = [
-        col for col in campaigns_df.columns 
-        if col not in column_mapping.keys() and col != "name"
-    ]
-
-    final_columns = ["name"] + model_columns_order + campaign_original_cols_not_mapped + ["Estrategia_Recomendada"]
-
-    final_columns_unique = []
-    seen = set()
-    for col in final_columns:
-        if col not in seen:
-            final_columns_unique.append(col)
-            seen.add(col)
-
-    campaigns_df = campaigns_df[final_columns_unique]
-
-    return campaigns_df
+        derived["% de impressões ganhas"] = campaigns_df["metric_prints"]
+
+    cost = pd.to_numeric(campaigns_df["metric_cost"], errors="coerce")
+    total_amount = pd.to_numeric(campaigns_df["metric_total_amount"], errors="coerce")
+    derived["(Investimento / Receitas)"] = total_amount.div(cost).where(cost != 0)
+
+    missing = pd.Series(pd.NA, index=campaigns_df.index, dtype=object)
+    columns = {"name": campaigns_df["name"]}
+    for col in strategy_model.columns:
+        if col in derived:
+            columns[col] = derived[col]
+        elif col in campaigns_df.columns:
+            columns[col] = campaigns_df[col]
+        else:
+            columns[col] = missing
 
+    for col in campaigns_df.columns:
+        if col not in columns and col not in CONSOLIDATION_COLUMN_MAPPING:
+            columns[col] = campaigns_df[col]
+    if "Estrategia_Recomendada" not in columns:
+        columns["Estrategia_Recomendada"] = campaigns_df["Estrategia_Recomendada"]
 
+    return pd.DataFrame(columns, index=campaigns_df.index)
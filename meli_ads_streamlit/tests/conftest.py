@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Os módulos do app são importados pelo nome, a partir da pasta meli_ads_streamlit
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Caches e históricos dos testes não tocam o .cache do projeto
+os.environ.setdefault("MELI_CACHE_DIR", tempfile.mkdtemp(prefix="meli-tests-"))
+os.environ.setdefault("MELI_EXPORT_DIR", tempfile.mkdtemp(prefix="meli-exports-"))
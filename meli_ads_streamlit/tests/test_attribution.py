@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import data_processor_module
+from attribution_module import CAMPAIGN_ATTRIBUTION_COLUMNS, add_tacos, campaign_attribution, item_attribution
+from order_columns_module import OrderColumnsBuilder
+
+def test_add_tacos_without_ads(monkeypatch):
+    monkeypatch.setattr(
+        data_processor_module, "run_attribution_collector",
+        lambda access_token, advertiser_id: (OrderColumnsBuilder().build(), pd.DataFrame()),
+    )
+    _, campaigns_attribution = data_processor_module.get_campaign_attribution("token-sem-anuncios", "1")
+    assert list(campaigns_attribution.columns) == list(CAMPAIGN_ATTRIBUTION_COLUMNS)
+
+    campaigns_df = pd.DataFrame({"campaign_id": [10, 20]})
+    result = add_tacos(campaigns_df, campaigns_attribution)
+    assert result[["metric_tacos", "vendas_totais", "vendas_organicas"]].isna().all().all()
+
+def test_add_tacos_reindexes_missing_columns():
+    result = add_tacos(pd.DataFrame({"campaign_id": [10]}), pd.DataFrame({"campaign_id": [10], "tacos": [12.5]}))
+    assert result.loc[0, "metric_tacos"] == 12.5
+    assert pd.isna(result.loc[0, "vendas_totais"])
+
+def test_item_shared_by_two_campaigns_splits_total_sales():
+    builder = OrderColumnsBuilder()
+    builder.add_orders([
+        {"id": 1, "status": "paid", "total_amount": 400.0, "date_created": "2026-10-01T10:00:00.000-03:00",
+         "order_items": [{"item": {"id": "MLB1"}, "quantity": 4, "unit_price": 100.0}]},
+        {"id": 2, "status": "paid", "total_amount": 50.0, "date_created": "2026-10-01T11:00:00.000-03:00",
+         "order_items": [{"item": {"id": "MLB2"}, "quantity": 1, "unit_price": 50.0}]},
+    ])
+    items_df = pd.DataFrame({
+        "item_id": ["MLB1", "MLB1", "MLB2"],
+        "campaign_id": [10, 20, 20],
+        "metric_cost": [30.0, 10.0, 5.0],
+        "metric_total_amount": [300.0, 100.0, 0.0],
+    })
+    items = item_attribution(builder.build(), items_df)
+    assert items["vendas_totais"].tolist() == pytest.approx([300.0, 100.0, 50.0])
+    assert items["unidades_totais"].tolist() == pytest.approx([3.0, 1.0, 1.0])
+
+    campaigns = campaign_attribution(items).set_index("campaign_id")
+    assert campaigns.loc[10, "vendas_totais"] == pytest.approx(300.0)
+    assert campaigns.loc[20, "vendas_totais"] == pytest.approx(150.0)
+    assert campaigns.loc[20, "tacos"] == pytest.approx(15 / 150 * 100)
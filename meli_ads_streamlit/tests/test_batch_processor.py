@@ -0,0 +1,12 @@
+import pytest
+
+from batch_processor_module import run_batch
+
+def test_run_batch_rejects_duplicate_client_names():
+    clients = [
+        {"client_name": "Loja", "access_token": "token-a"},
+        {"client_name": "Outra", "access_token": "token-b"},
+        {"client_name": "Loja", "access_token": "token-c"},
+    ]
+    with pytest.raises(ValueError, match="Loja"):
+        run_batch(clients)
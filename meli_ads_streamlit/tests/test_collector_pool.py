@@ -0,0 +1,30 @@
+import time
+
+import meli_ads_collector_module as collector_module
+from meli_ads_collector_module import get_collector, get_shared_http_adapter
+
+def test_get_collector_reuses_and_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(collector_module, "MAX_COLLECTORS", 2)
+    monkeypatch.setattr(collector_module, "_collectors", collector_module.OrderedDict())
+
+    first = get_collector("token-1")
+    assert get_collector("token-1") is first
+    second = get_collector("token-2")
+    get_collector("token-1")
+    get_collector("token-3")
+
+    assert len(collector_module._collectors) == 2
+    assert get_collector("token-1") is first
+    assert get_collector("token-2") is not second
+    # O coletor descartado fecha só a própria sessão; o pool compartilhado continua montado nos demais
+    assert not second.session.adapters
+    assert first.session.get_adapter("https://api.mercadolibre.com") is get_shared_http_adapter()
+
+def test_get_collector_drops_idle_collectors(monkeypatch):
+    monkeypatch.setattr(collector_module, "COLLECTOR_IDLE_SECONDS", 0.05)
+    monkeypatch.setattr(collector_module, "_collectors", collector_module.OrderedDict())
+
+    get_collector("token-a")
+    time.sleep(0.1)
+    get_collector("token-b")
+    assert list(collector_module._collectors) == [collector_module.token_namespace("token-b")]
@@ -0,0 +1,81 @@
+"""Regressão: coleta concorrente de pedidos x cálculo original sobre a lista completa de pedidos."""
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+from fake_api_server import ADVERTISER_ID, FakeMeliData, FakeMeliServer
+from meli_ads_collector_module import ADS_METRICS, MercadoLivreAdsCollector
+from response_cache_module import today_meli
+
+def _legacy_orders_metrics(all_orders):
+    """Fórmulas de `get_orders_metrics` antes da coleta concorrente."""
+    valid_orders = [o for o in all_orders if o.get('status') in ['paid', 'shipped', 'delivered']]
+    cancelled_orders = [o for o in all_orders if o.get('status') == 'cancelled']
+    vendas_brutas = sum(order['total_amount'] for order in valid_orders if 'total_amount' in order)
+    unidades_vendidas = sum(item['quantity'] for order in valid_orders for item in order.get('order_items', []))
+    total_de_vendas = len(valid_orders)
+    return {
+        "vendas_brutas": vendas_brutas, "unidades_vendidas": unidades_vendidas,
+        "total_de_vendas": total_de_vendas,
+        "ticket_medio": vendas_brutas / total_de_vendas if total_de_vendas > 0 else 0,
+        "preco_medio_por_unidade": vendas_brutas / unidades_vendidas if unidades_vendidas > 0 else 0,
+        "qtd_vendas_canceladas": len(cancelled_orders),
+        "valor_vendas_canceladas": sum(o['total_amount'] for o in cancelled_orders if 'total_amount' in o),
+    }
+
+@pytest.fixture(scope="module")
+def fake_api():
+    data = FakeMeliData(n_orders=1_200, n_campaigns=20, days=12, seed=7)
+    with FakeMeliServer(data, rate_429=0.05) as server:
+        yield data, server
+
+@pytest.mark.parametrize("max_workers", [1, 6])
+def test_orders_metrics_match_serial_formulas(fake_api, max_workers):
+    data, server = fake_api
+    collector = MercadoLivreAdsCollector(
+        "token-teste", max_workers=max_workers, requests_per_second=500, use_cache=False, base_url=server.base_url,
+    )
+    collector.session.backoff_base = 0.01
+    date_to = today_meli()
+    date_from = date_to - timedelta(days=9)
+
+    result = collector.get_orders_metrics(collector.get_user_id(), date_from.isoformat(), date_to.isoformat())
+
+    orders, _ = data.orders_page(f"{date_from}T00:00:00.000-03:00", f"{date_to}T23:59:59.999-03:00", 0, len(data.orders))
+    expected = _legacy_orders_metrics(orders)
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value), key
+
+def test_fan_out_pages_bounds_pages_in_flight():
+    collector = MercadoLivreAdsCollector("token-janela", max_workers=2, use_cache=False)
+    lock = threading.Lock()
+    started, consumed, ahead = [], [], []
+
+    def fetch_page(offset):
+        with lock:
+            started.append(offset)
+            ahead.append(len(started) - len(consumed))
+        if offset == 10:
+            time.sleep(0.05)  # Página lenta: as seguintes não podem se acumular atrás dela
+        return {"results": [offset], "paging": {"total": 500}}
+
+    for page in collector._fan_out_pages(fetch_page, limit=10):
+        with lock:
+            consumed.append(page["results"][0])
+    assert consumed == list(range(0, 500, 10))
+    assert max(ahead) <= 2 * collector.max_workers + 1
+
+def test_single_day_saved_to_warehouse_only_with_all_metrics(fake_api):
+    _, server = fake_api
+    collector = MercadoLivreAdsCollector("token-warehouse", use_cache=False, base_url=server.base_url)
+    collector.session.backoff_base = 0.01
+    day = (today_meli() - timedelta(days=2)).isoformat()
+
+    collector.get_campaigns_dataframe(ADVERTISER_ID, day, day, metrics=["clicks", "cost"])
+    assert not collector.warehouse.covered_days(ADVERTISER_ID, day, day)
+
+    collector.get_campaigns_dataframe(ADVERTISER_ID, day, day, metrics=ADS_METRICS)
+    assert day in collector.warehouse.covered_days(ADVERTISER_ID, day, day)
@@ -0,0 +1,10 @@
+import data_processor_module
+from goals_module import GoalsStore
+
+def test_monthly_targets_survive_token_refresh(monkeypatch, tmp_path):
+    store = GoalsStore(str(tmp_path / "goals.sqlite3"))
+    monkeypatch.setattr(data_processor_module, "get_default_goals_store", lambda: store)
+    monkeypatch.setattr(data_processor_module, "get_seller_id", lambda access_token: 123456)
+
+    assert data_processor_module.save_monthly_targets("token-antigo", "2026-10", {"vendas_brutas": 50_000})
+    assert data_processor_module.get_monthly_targets("token-renovado", "2026-10") == {"vendas_brutas": 50_000}
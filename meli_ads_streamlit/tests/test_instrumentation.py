@@ -0,0 +1,24 @@
+import pytest
+
+from instrumentation_module import MetricsRegistry
+
+def test_prometheus_escapes_label_values():
+    registry = MetricsRegistry()
+    registry.inc("meli_http_errors_total", path='/a"b\\c\nd')
+    assert 'meli_http_errors_total{path="/a\\"b\\\\c\\nd"} 1' in registry.to_prometheus().splitlines()
+
+def test_merge_adds_metrics_recorded_since_snapshot():
+    child = MetricsRegistry()
+    child.inc("meli_pages_total", 3)
+    child.observe("meli_stage_seconds", 0.2, stage="matching")
+    before = child.snapshot()
+    child.inc("meli_pages_total", 2)
+    child.observe("meli_stage_seconds", 0.3, stage="matching")
+
+    parent = MetricsRegistry()
+    parent.observe("meli_stage_seconds", 0.1, stage="matching")
+    parent.merge(child.since(before))
+    histograms = parent.histograms_frame()
+    assert parent.counters_frame()["valor"].tolist() == [2]
+    assert histograms["contagem"].tolist() == [2]
+    assert histograms["total_s"].iloc[0] == pytest.approx(0.4)
@@ -0,0 +1,108 @@
+"""Regressão: matching e consolidação vetorizados x implementação original linha a linha."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy_analyzer_module import (
+    NO_STRATEGY, consolidate_data, find_best_strategy, hardcoded_strategy_model_data, recommend_strategies,
+)
+
+# --- Implementação original (linha a linha), mantida só como referência ---
+
+def _legacy_find_best_strategy(campaign, strategy_model):
+    best_match_strategy = NO_STRATEGY
+    min_diff = float("inf")
+    for _, strategy in strategy_model.iterrows():
+        acos_diff = abs(campaign["metric_acos"] - strategy["ACOS"])
+        impression_match = (
+            str(strategy.get("Tipo de Impressão", "")).strip() in ("Baixa Impressão", "Media Impressão", "Impressões elevadas")
+            and str(campaign.get("Tipo de Impressão", "")).strip() == str(strategy.get("Tipo de Impressão", "")).strip()
+        )
+        clicks_match = False
+        if pd.notna(campaign["metric_clicks"]) and pd.notna(strategy["Cliques"]):
+            if strategy["Cliques"] == 0:
+                clicks_match = campaign["metric_clicks"] < 5
+            else:
+                clicks_match = abs(campaign["metric_clicks"] - strategy["Cliques"]) <= 10
+        current_diff = acos_diff + (0 if impression_match else 100) + (0 if clicks_match else 50)
+        if current_diff < min_diff:
+            min_diff = current_diff
+            best_match_strategy = strategy["Nome"]
+    return best_match_strategy
+
+def _legacy_consolidate_data(campaigns_df):
+    campaigns_df = campaigns_df.copy()
+    column_mapping = {
+        "name": "Nome", "budget": "Orçamento", "acos_target": "ACOS Objetivo", "metric_acos": "ACOS",
+        "metric_clicks": "Cliques", "metric_units_quantity": "Unidades vendidas por publicidade",
+    }
+    for campaign_col, model_col in column_mapping.items():
+        campaigns_df[model_col] = campaigns_df[campaign_col]
+    if "Tipo de Impressão" not in campaigns_df.columns:
+        campaigns_df["Tipo de Impressão"] = ""
+    if "% de impressões ganhas" not in campaigns_df.columns:
+        campaigns_df["% de impressões ganhas"] = campaigns_df["metric_prints"]
+    campaigns_df["(Investimento / Receitas)"] = campaigns_df.apply(
+        lambda row: row["metric_total_amount"] / row["metric_cost"] if row["metric_cost"] != 0 else pd.NA, axis=1
+    )
+    model_columns = pd.DataFrame(hardcoded_strategy_model_data).columns.tolist()
+    for col in model_columns:
+        if col not in campaigns_df.columns:
+            campaigns_df[col] = pd.NA
+    not_mapped = [c for c in campaigns_df.columns if c not in column_mapping and c != "name"]
+    final_columns = list(dict.fromkeys(["name"] + model_columns + not_mapped + ["Estrategia_Recomendada"]))
+    return campaigns_df[final_columns]
+
+# --- Fixture fixa ---
+
+@pytest.fixture
+def campaigns_df():
+    rng = np.random.default_rng(20240601)
+    n = 120
+    df = pd.DataFrame({
+        "campaign_id": np.arange(n),
+        "name": [f"Campanha {i}" for i in range(n)],
+        "status": rng.choice(["active", "paused"], n),
+        "budget": rng.choice([15.0, 850.0, 1800.0, 20000.0], n),
+        "acos_target": rng.choice([5.0, 8.0, 20.0, 45.0], n),
+        "metric_acos": rng.uniform(0, 60, n).round(2),
+        "metric_clicks": rng.choice([0, 1, 3, 8, 45, 55, 95, 110, 495, 1000, 1012], n).astype(float),
+        "metric_prints": rng.integers(0, 50_000, n).astype(float),
+        "metric_cost": rng.uniform(0, 500, n).round(2),
+        "metric_total_amount": rng.uniform(0, 5000, n).round(2),
+        "metric_units_quantity": rng.integers(0, 40, n).astype(float),
+        "Tipo de Impressão": rng.choice(
+            ["Baixa Impressão", "Media Impressão", "Impressões elevadas", " Media Impressão ", "Outro", ""], n
+        ),
+    })
+    # Casos de borda: cliques e ACOS ausentes, custo zero
+    df.loc[[3, 17], "metric_clicks"] = np.nan
+    df.loc[[5, 40], "metric_acos"] = np.nan
+    df.loc[[7, 8], "metric_cost"] = 0.0
+    return df
+
+def test_recommend_strategies_matches_row_wise(campaigns_df):
+    legacy_model = pd.DataFrame(hardcoded_strategy_model_data)
+    expected = campaigns_df.apply(lambda row: _legacy_find_best_strategy(row, legacy_model), axis=1).to_numpy()
+    np.testing.assert_array_equal(recommend_strategies(campaigns_df), expected)
+
+def test_find_best_strategy_matches_row_wise(campaigns_df):
+    legacy_model = pd.DataFrame(hardcoded_strategy_model_data)
+    for _, row in campaigns_df.head(15).iterrows():
+        assert find_best_strategy(row) == _legacy_find_best_strategy(row, legacy_model)
+
+def test_consolidate_data_matches_row_wise(campaigns_df):
+    campaigns_df["Estrategia_Recomendada"] = recommend_strategies(campaigns_df)
+    original = campaigns_df.copy()
+    result = consolidate_data(campaigns_df)
+    expected = _legacy_consolidate_data(campaigns_df)
+
+    pd.testing.assert_frame_equal(campaigns_df, original)
+    assert list(result.columns) == list(expected.columns)
+    for column in expected.columns:
+        left = pd.to_numeric(result[column], errors="coerce")
+        right = pd.to_numeric(expected[column], errors="coerce")
+        if right.notna().any():
+            np.testing.assert_allclose(left.to_numpy(dtype=float), right.to_numpy(dtype=float), equal_nan=True)
+        else:
+            assert result[column].astype(str).tolist() == expected[column].astype(str).tolist(), column